@@ -0,0 +1,87 @@
+"""
+Короткоживущий кеш ответов API.
+Redis (если задан REDIS_URL), иначе словарь в памяти процесса.
+Без Redis у каждого процесса свой кеш: сбросы из serp_job_worker.py (отдельный процесс)
+до API не доходят, и API отдает устаревшие данные до истечения TTL.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+import orjson
+from loguru import logger
+from config_simple import settings
+
+redis_client = None
+
+# Fallback без Redis: ключ -> (значение в JSON, время истечения по time.monotonic()), LRU
+MEMORY_CACHE_MAXSIZE = 4096
+_memory_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+async def init_cache():
+    """Подключение к Redis (вызывается в lifespan)"""
+    global redis_client
+    if not settings.redis_url:
+        logger.info("Redis URL not configured, using in-process API cache")
+        return
+
+    try:
+        import redis.asyncio as redis
+        redis_client = redis.from_url(settings.redis_url)
+        await redis_client.ping()
+        logger.info("Redis API cache connected")
+    except Exception as e:
+        logger.warning(f"⚠️ Redis unavailable, using in-process API cache: {e}")
+        redis_client = None
+
+async def close_cache():
+    """Закрытие соединения с Redis"""
+    global redis_client
+    if redis_client is not None:
+        await redis_client.close()
+        redis_client = None
+
+async def cache_get(key: str) -> Optional[Any]:
+    """Получение значения из кеша (None если нет или устарело)"""
+    if redis_client is not None:
+        try:
+            raw = await redis_client.get(key)
+            return orjson.loads(raw) if raw is not None else None
+        except Exception as e:
+            logger.warning(f"⚠️ Redis cache read failed: {e}")
+            return None
+
+    entry = _memory_cache.get(key)
+    if entry is None:
+        return None
+    raw, expires_at = entry
+    if expires_at <= time.monotonic():
+        _memory_cache.pop(key, None)
+        return None
+    _memory_cache.move_to_end(key)
+    return orjson.loads(raw)
+
+async def cache_set(key: str, value: Any, ttl: int):
+    """Сохранение значения в кеш на ttl секунд"""
+    raw = orjson.dumps(value)
+    if redis_client is not None:
+        try:
+            await redis_client.set(key, raw, ex=ttl)
+        except Exception as e:
+            logger.warning(f"⚠️ Redis cache write failed: {e}")
+        return
+
+    _memory_cache[key] = (raw, time.monotonic() + ttl)
+    _memory_cache.move_to_end(key)
+    if len(_memory_cache) > MEMORY_CACHE_MAXSIZE:
+        _memory_cache.popitem(last=False)
+
+async def cache_delete(key: str):
+    """Удаление значения из кеша"""
+    if redis_client is not None:
+        try:
+            await redis_client.delete(key)
+        except Exception as e:
+            logger.warning(f"⚠️ Redis cache delete failed: {e}")
+        return
+
+    _memory_cache.pop(key, None)
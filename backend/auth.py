@@ -6,8 +6,11 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from models import User
+from schemas import UserResponse
 from database import get_db
+from app_cache import cache_get, cache_set
 import os
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -19,6 +22,15 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "2016
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
+# Пользователь кешируется по sub (email) в app_cache (Redis или память процесса),
+# чтобы не ходить в БД на каждый запрос. В кеше только поля UserResponse, без ORM объекта.
+# API не меняет пароль и статус пользователя; изменения напрямую в БД (блокировка)
+# вступают в силу не позже чем через USER_CACHE_TTL_SECONDS.
+USER_CACHE_TTL_SECONDS = 300
+
+def _user_cache_key(email: str) -> str:
+    return f"user:{email}"
+
 def hash_password(password: str) -> str:
     """Хеширование пароля"""
     return pwd_context.hash(password)
@@ -42,8 +54,8 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
-):
-    """Получение текущего пользователя из JWT токена"""
+) -> UserResponse:
+    """Получение текущего пользователя из JWT токена (поля UserResponse, не ORM объект User)"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -51,14 +63,18 @@ async def get_current_user(
     )
     
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
         user_email: str = payload.get("sub")
         if user_email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
     
+    cache_key = _user_cache_key(user_email)
+    cached_user = await cache_get(cache_key)
+    if cached_user is not None:
+        return UserResponse.model_validate(cached_user)
+    
     # Получаем пользователя из базы данных
     result = await db.execute(select(User).where(User.email == user_email))
     user = result.scalar_one_or_none()
@@ -66,4 +82,12 @@ async def get_current_user(
     if user is None:
         raise credentials_exception
     
-    return user
+    current_user = UserResponse.model_validate(user)
+    # Не дольше оставшегося времени жизни токена
+    ttl = USER_CACHE_TTL_SECONDS
+    if payload.get("exp") is not None:
+        # exp - UTC epoch; time.time() не зависит от часового пояса хоста
+        ttl = min(ttl, int(payload["exp"] - time.time()))
+    if ttl > 0:
+        await cache_set(cache_key, current_user.model_dump(), ttl)
+    return current_user
@@ -18,6 +18,16 @@ class Settings(BaseSettings):
     
     # База данных
     database_url: str = Field(description="URL базы данных")
+    db_pool_size: int = Field(default=0, description="Размер пула соединений PostgreSQL (0 - без пула, для Supabase Pooler)")
+    db_max_overflow: int = Field(default=40, description="Дополнительные соединения сверх пула")
+    db_pool_recycle: int = Field(default=1800, description="Пересоздание соединений пула через N секунд")
+    db_statement_cache_size: int = Field(default=0, description="Кеш prepared statements asyncpg (0 - для Supabase Pooler/pgbouncer)")
+    database_replica_url: Optional[str] = Field(default=None, description="URL read-реплики для read-only эндпоинтов")
+    
+    # Сжатие ответов (отключить, если сжатием занимается nginx/traefik)
+    gzip_enabled: bool = Field(default=True, description="Сжатие ответов через GZipMiddleware")
+    gzip_minimum_size: int = Field(default=4096, description="Минимальный размер ответа для сжатия в байтах")
+    gzip_compress_level: int = Field(default=1, description="Уровень сжатия gzip (1 - быстрее всего, 9 - сильнее всего)")
     
     # CORS
     cors_origins: str = Field(default="http://localhost:3000", description="CORS origins")
@@ -57,11 +67,23 @@ class Settings(BaseSettings):
     worker_interval_hours: int = Field(default=336, description="Интервал воркера в часах (14 дней)")
     worker_batch_size: int = Field(default=10, description="Размер batch для воркера")
     worker_delay_seconds: int = Field(default=2, description="Задержка между запросами в секундах")
+    serp_concurrency: int = Field(default=10, ge=1, description="Максимум одновременных запросов к LLM при обновлении SERP")
+    serp_commit_chunk: int = Field(default=200, ge=1, description="Количество пар слово-LLM на один коммит при сохранении SERP")
+    llm_cache_ttl_hours: int = Field(default=168, description="Время жизни кеша ответов LLM в часах (7 дней)")
+    serp_jobs_external: bool = Field(default=False, description="Задачи обновления SERP выполняет отдельный процесс serp_job_worker.py")
+    serp_job_poll_seconds: int = Field(default=5, description="Интервал опроса очереди задач SERP в секундах")
+    serp_job_lease_seconds: int = Field(default=300, ge=30, description="Задача SERP без heartbeat дольше этого времени считается прерванной")
+    openai_batch_threshold: int = Field(default=50, description="Минимум запросов OpenAI для отправки через Batch API (0 - отключено)")
     
     # Logging
     log_level: str = Field(default="INFO", description="Уровень логирования")
     log_file: str = Field(default="logs/app.log", description="Файл логов")
     
+    # Redis (опционально, без него кеш хранится в памяти процесса)
+    redis_url: Optional[str] = Field(default=None, description="Redis URL для кеширования")
+    stats_cache_ttl_seconds: int = Field(default=60, description="Время жизни кеша /api/stats в секундах")
+    word_analytics_cache_ttl_seconds: int = Field(default=30, description="Время жизни кеша аналитики слова в секундах (0 - отключено)")
+    
     # Monitoring
     sentry_dsn: Optional[str] = Field(default=None, description="Sentry DSN для мониторинга")
     
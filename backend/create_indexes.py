@@ -0,0 +1,37 @@
+"""
+Скрипт для создания индексов на уже существующих таблицах.
+init_database() создает индексы только вместе с новыми таблицами.
+На PostgreSQL индексы создаются CONCURRENTLY, без блокировки записи в таблицы.
+"""
+import asyncio
+from database import engine, Base
+import models  # noqa: F401 - регистрация моделей в metadata
+
+def _create_missing_indexes(sync_conn):
+    """Создание всех объявленных в моделях индексов, которых еще нет в БД"""
+    concurrently = sync_conn.dialect.name == "postgresql"
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if concurrently:
+                index.dialect_options["postgresql"]["concurrently"] = True
+            index.create(sync_conn, checkfirst=True)
+            print(f"  - {table.name}: {index.name}")
+
+async def main():
+    """Главная функция"""
+    print("🚀 Создание индексов...")
+    
+    try:
+        async with engine.connect() as conn:
+            # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции
+            if engine.dialect.name == "postgresql":
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.run_sync(_create_missing_indexes)
+        print("✅ Индексы созданы успешно")
+    except Exception as e:
+        print(f"❌ Ошибка создания индексов: {e}")
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -25,35 +25,67 @@ def _build_ssl_context() -> ssl.SSLContext:
         ctx.verify_mode = ssl.CERT_NONE
         return ctx
 
-# Создаем асинхронный движок базы данных
-if settings.database_url.startswith("sqlite"):
-    # Настройки для SQLite
-    engine = create_async_engine(
-        settings.database_url,
-        echo=False,  # Отключаем логи SQL запросов
-        connect_args={"check_same_thread": False}
-    )
-else:
+def _create_engine(database_url: str, read_only: bool = False):
+    """Создание асинхронного движка базы данных"""
+    if database_url.startswith("sqlite"):
+        # Настройки для SQLite
+        return create_async_engine(
+            database_url,
+            echo=False,  # Отключаем логи SQL запросов
+            connect_args={"check_same_thread": False}
+        )
+    
     # Настройки для PostgreSQL (Supabase)
-    ssl_ctx = _build_ssl_context()
-    engine = create_async_engine(
-        settings.database_url,
-        poolclass=NullPool,
-        echo=False,  # Отключаем логи SQL запросов
-        connect_args={
-            # SSL context is mandatory for Supabase Pooler
-            "ssl": ssl_ctx,
-            # Optional server settings and asyncpg tuning
-            "server_settings": {
-                "application_name": "seo_analyzer",
-                "jit": "off",
-            },
-            "command_timeout": 60,
-            "statement_cache_size": 0,
+    # DB_POOL_SIZE=0 - без пула (NullPool), соединения держит Supabase Pooler;
+    # при прямом подключении к Postgres включаем собственный пул с проверкой соединений
+    if settings.db_pool_size > 0:
+        pool_kwargs = {
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_pre_ping": True,
+            "pool_recycle": settings.db_pool_recycle,
         }
+    else:
+        pool_kwargs = {"poolclass": NullPool}
+    
+    server_settings = {
+        "application_name": "seo_analyzer",
+        "jit": "off",
+    }
+    if read_only:
+        # Все транзакции реплики только на чтение
+        server_settings["default_transaction_read_only"] = "on"
+    
+    connect_args = {
+        # SSL context is mandatory for Supabase Pooler
+        "ssl": _build_ssl_context(),
+        # Optional server settings and asyncpg tuning
+        "server_settings": server_settings,
+        "command_timeout": 60,
+        # Prepared statements не переживают transaction pooling (Supabase Pooler/pgbouncer),
+        # поэтому кеш включается только явно, при прямом подключении к Postgres
+        "statement_cache_size": settings.db_statement_cache_size,
+    }
+    if settings.db_statement_cache_size > 0:
+        connect_args["prepared_statement_cache_size"] = settings.db_statement_cache_size
+    
+    return create_async_engine(
+        database_url,
+        **pool_kwargs,
+        echo=False,  # Отключаем логи SQL запросов
+        connect_args=connect_args
     )
 
-# Создаем фабрику сессий
+# Создаем асинхронный движок базы данных
+engine = _create_engine(settings.database_url)
+
+# Движок реплики для read-only эндпоинтов (без DATABASE_REPLICA_URL - основная БД)
+if settings.database_replica_url:
+    replica_engine = _create_engine(settings.database_replica_url, read_only=True)
+else:
+    replica_engine = engine
+
+# Создаем фабрики сессий
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -61,6 +93,13 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,  # Отключаем автофлуш для лучшей производительности
 )
 
+AsyncSessionLocalRO = async_sessionmaker(
+    replica_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+)
+
 Base = declarative_base()
 
 # Dependency для получения сессии базы данных
@@ -76,6 +115,19 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         finally:
             await session.close()
 
+# Dependency для read-only эндпоинтов (реплика, если настроена)
+async def get_db_ro() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency для получения read-only сессии базы данных"""
+    async with AsyncSessionLocalRO() as session:
+        try:
+            yield session
+        except Exception as e:
+            logger.error(f"Database session error: {e}")
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
 # Контекстный менеджер для background задач
 @asynccontextmanager
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
@@ -97,18 +149,91 @@ async def check_database_connection() -> bool:
         from sqlalchemy import text
         async with engine.begin() as conn:
             await conn.execute(text("SELECT 1"))
-        logger.info("✅ Database connection successful")
+        logger.info(f"✅ Database connection successful, pool: {engine.pool.status()}")
         return True
     except Exception as e:
         logger.error(f"❌ Database connection failed: {e}")
         return False
 
+# Счетчики упоминаний по проектам (только PostgreSQL): таблица brand_project_agg,
+# которую триггер на brand_mentions обновляет при каждой вставке/изменении/удалении.
+# Эндпоинт аналитики читает одну строку по первичному ключу.
+USE_BRAND_PROJECT_AGG = engine.dialect.name == "postgresql"
+
+BRAND_PROJECT_AGG_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS brand_project_agg (
+        project_id UUID PRIMARY KEY REFERENCES brand_projects (uuid) ON DELETE CASCADE,
+        total BIGINT NOT NULL DEFAULT 0,
+        brand_hits BIGINT NOT NULL DEFAULT 0,
+        comp_hits BIGINT NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE OR REPLACE FUNCTION brand_project_agg_apply() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.project_id IS NOT NULL THEN
+            UPDATE brand_project_agg
+            SET total = total - 1,
+                brand_hits = brand_hits - (CASE WHEN OLD.brand_mentioned = 1 THEN 1 ELSE 0 END),
+                comp_hits = comp_hits - (CASE WHEN OLD.competitor_mentioned = 1 THEN 1 ELSE 0 END)
+            WHERE project_id = OLD.project_id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.project_id IS NOT NULL THEN
+            INSERT INTO brand_project_agg AS agg (project_id, total, brand_hits, comp_hits)
+            VALUES (
+                NEW.project_id,
+                1,
+                CASE WHEN NEW.brand_mentioned = 1 THEN 1 ELSE 0 END,
+                CASE WHEN NEW.competitor_mentioned = 1 THEN 1 ELSE 0 END
+            )
+            ON CONFLICT (project_id) DO UPDATE
+            SET total = agg.total + 1,
+                brand_hits = agg.brand_hits + EXCLUDED.brand_hits,
+                comp_hits = agg.comp_hits + EXCLUDED.comp_hits;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    # Триггер создается один раз вместе с начальным заполнением из уже накопленных упоминаний;
+    # блокировка не дает вставкам проскочить между подсчетом и созданием триггера
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_brand_mentions_agg') THEN
+            LOCK TABLE brand_mentions IN SHARE ROW EXCLUSIVE MODE;
+            INSERT INTO brand_project_agg (project_id, total, brand_hits, comp_hits)
+            SELECT project_id,
+                   count(*),
+                   count(*) FILTER (WHERE brand_mentioned = 1),
+                   count(*) FILTER (WHERE competitor_mentioned = 1)
+            FROM brand_mentions
+            WHERE project_id IS NOT NULL
+            GROUP BY project_id
+            ON CONFLICT (project_id) DO UPDATE
+            SET total = EXCLUDED.total,
+                brand_hits = EXCLUDED.brand_hits,
+                comp_hits = EXCLUDED.comp_hits;
+            CREATE TRIGGER trg_brand_mentions_agg
+                AFTER INSERT OR UPDATE OR DELETE ON brand_mentions
+                FOR EACH ROW EXECUTE FUNCTION brand_project_agg_apply();
+        END IF;
+    END
+    $$
+    """,
+)
+
 # Функция для инициализации базы данных
 async def init_database():
     """Инициализация базы данных"""
     try:
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            if USE_BRAND_PROJECT_AGG:
+                from sqlalchemy import text
+                for statement in BRAND_PROJECT_AGG_DDL:
+                    await conn.execute(text(statement))
         logger.info("✅ Database tables created successfully")
     except Exception as e:
         logger.error(f"❌ Database initialization failed: {e}")
@@ -118,4 +243,6 @@ async def init_database():
 async def close_database():
     """Закрытие соединений с базой данных"""
     await engine.dispose()
+    if replica_engine is not engine:
+        await replica_engine.dispose()
     logger.info("✅ Database connections closed")
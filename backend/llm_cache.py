@@ -0,0 +1,118 @@
+"""
+Кеш ответов LLM, адресуемый по содержимому запроса.
+Два уровня: L1 - LRU в памяти процесса, L2 - таблица llm_cache в БД.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from loguru import logger
+from config_simple import settings
+from database import AsyncSessionLocal, engine
+from models import LLMCache
+
+# Версия промптов: при изменении промптов старые записи перестают совпадать
+PROMPT_VERSION = "v1"
+
+# L1: ключ -> (ответ, expires_at); сбрасывается при перезапуске процесса
+MEMORY_CACHE_MAXSIZE = 4096
+_memory_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+# L2: устаревшие строки удаляются при записи, не чаще раза в интервал на процесс
+PURGE_INTERVAL_SECONDS = 3600
+_last_purge = 0.0
+
+def make_cache_key(provider: str, model: Optional[str], text: str) -> str:
+    """Ключ кеша: sha256(provider | model | prompt_version | text)"""
+    raw = f"{provider}|{model or ''}|{PROMPT_VERSION}|{text}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def _utcnow() -> datetime:
+    # Колонки TIMESTAMP без таймзоны
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def _memory_get(key: str) -> Optional[str]:
+    entry = _memory_cache.get(key)
+    if entry is None:
+        return None
+    response, expires_at = entry
+    if expires_at <= _utcnow():
+        del _memory_cache[key]
+        return None
+    _memory_cache.move_to_end(key)
+    return response
+
+def _memory_set(key: str, response: str, expires_at: datetime):
+    _memory_cache[key] = (response, expires_at)
+    _memory_cache.move_to_end(key)
+    if len(_memory_cache) > MEMORY_CACHE_MAXSIZE:
+        _memory_cache.popitem(last=False)
+
+async def get_cached_response(key: str) -> Optional[str]:
+    """Получение ответа из кеша (None если нет или устарел)"""
+    response = _memory_get(key)
+    if response is not None:
+        return response
+    
+    try:
+        async with AsyncSessionLocal() as session:
+            row = (await session.execute(
+                select(LLMCache.response, LLMCache.expires_at).where(
+                    LLMCache.input_hash == key,
+                    LLMCache.expires_at > _utcnow()
+                )
+            )).first()
+        if row is None:
+            return None
+        _memory_set(key, row.response, row.expires_at)
+        return row.response
+    except Exception as e:
+        logger.warning(f"⚠️ LLM cache read failed: {e}")
+        return None
+
+async def set_cached_response(key: str, provider: str, model: Optional[str], response: str):
+    """Сохранение ответа в кеш на llm_cache_ttl_hours"""
+    expires_at = _utcnow() + timedelta(hours=settings.llm_cache_ttl_hours)
+    _memory_set(key, response, expires_at)
+    
+    # Один INSERT ... ON CONFLICT DO UPDATE: параллельные воркеры с одинаковым ключом не конфликтуют
+    insert = pg_insert if engine.dialect.name == "postgresql" else sqlite_insert
+    values = {
+        "provider": provider,
+        "model": model,
+        "prompt_version": PROMPT_VERSION,
+        "response": response,
+        "expires_at": expires_at,
+    }
+    stmt = insert(LLMCache).values(input_hash=key, **values)
+    stmt = stmt.on_conflict_do_update(index_elements=[LLMCache.input_hash], set_=values)
+    
+    try:
+        async with AsyncSessionLocal() as session:
+            await session.execute(stmt)
+            await session.commit()
+    except Exception as e:
+        logger.warning(f"⚠️ LLM cache write failed: {e}")
+        return
+    
+    global _last_purge
+    if time.monotonic() - _last_purge >= PURGE_INTERVAL_SECONDS:
+        _last_purge = time.monotonic()
+        await purge_expired_responses()
+
+async def purge_expired_responses() -> int:
+    """Удаление устаревших записей из llm_cache (по индексу на expires_at)"""
+    try:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(delete(LLMCache).where(LLMCache.expires_at <= _utcnow()))
+            await session.commit()
+        if result.rowcount:
+            logger.info(f"Purged {result.rowcount} expired LLM cache entries")
+        return result.rowcount
+    except Exception as e:
+        logger.warning(f"⚠️ LLM cache purge failed: {e}")
+        return 0
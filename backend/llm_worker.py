@@ -3,7 +3,7 @@ import json
 import time
 from datetime import datetime, timedelta
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy import select, create_engine
+from sqlalchemy import select, insert, create_engine
 from models import Word, LLM, WordSerp, Company, BrandProject, BrandMention, Competitor
 import logging
 from config_simple import settings
@@ -216,21 +216,14 @@ class LLMWorker:
             # Extract companies from LLM response
             companies = self.extract_companies_from_response(llm_response)
             
-            # Save companies
-            for company_name in companies:
-                # Check if company already exists for this SERP
-                existing_company = db.scalar(
-                    select(Company).where(
-                        Company.name == company_name,
-                        Company.serp_id == word_serp.uuid
-                    )
+            # Save companies: the SERP row is new, so duplicates can only come from the response itself.
+            # One multi-row INSERT instead of a SELECT + INSERT per company
+            unique_companies = list(dict.fromkeys(companies))
+            if unique_companies:
+                db.execute(
+                    insert(Company),
+                    [{"name": company_name, "serp_id": word_serp.uuid} for company_name in unique_companies]
                 )
-                if not existing_company:
-                    new_company = Company(
-                        name=company_name,
-                        serp_id=word_serp.uuid
-                    )
-                    db.add(new_company)
             
             # Analyze brand mentions for this word's group
             self.analyze_brand_mentions_for_word(word, word_serp, llm_response, db)
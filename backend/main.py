@@ -1,479 +1,80 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, status, BackgroundTasks, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, insert, delete, exists, lambda_stmt, and_, func, case, desc
+from sqlalchemy.orm import selectinload, raiseload
 from typing import List, Optional
+import asyncio
 import uuid
 from loguru import logger
 
 # Configuration and logging imports
 from config_simple import settings
 from logging_config import setup_logging, setup_sentry
-from database import get_db, check_database_connection, init_database, close_database, AsyncSessionLocal
-from models import User, WordGroup, Word, LLM, WordSerp, Company, BrandProject, Competitor, BrandMention
+from database import (
+    get_db, get_db_ro, check_database_connection, init_database, close_database,
+    AsyncSessionLocal, AsyncSessionLocalRO, USE_BRAND_PROJECT_AGG
+)
+from models import User, WordGroup, Word, LLM, WordSerp, Company, BrandProject, Competitor, BrandMention, SerpBatch, SerpJob, brand_project_agg
 from schemas import (
     UserCreate, UserLogin, UserResponse, Token,
     WordGroupCreate, WordGroupUpdate, WordGroupResponse,
     WordCreate, WordUpdate, WordResponse,
     LLMCreate, LLMUpdate, LLMResponse,
     WordSerpResponse, CompanyResponse,
-    WordAnalytics, GroupAnalytics,
+    GroupAnalytics,
     BrandProjectCreate, BrandProjectResponse, BrandProjectUpdate,
-    CompetitorResponse, BrandMentionResponse, BrandAnalytics
+    BrandMentionResponse, BrandAnalytics, TopCompetitor, RecentMention,
+    SerpJobResponse
 )
 from auth import hash_password, verify_password, create_access_token, get_current_user
 from llm_service_modern import llm_service
-import requests
-import json
-from datetime import datetime, timedelta
-
-# === DIRECT SERP UPDATE FUNCTIONS ===
-
-async def get_gemini_response_direct(word: str) -> str:
-    """Direct Gemini response retrieval for brand analysis"""
-    try:
-        headers = {
-            "Content-Type": "application/json"
-        }
-        
-        data = {
-            "contents": [{
-                "parts": [{"text": word}]
-            }],
-            "generationConfig": {
-                "maxOutputTokens": 2000,
-                "temperature": 0.7
-            }
-        }
-        
-        response = requests.post(
-            f"{settings.gemini_api_url}?key={settings.gemini_api_key}",
-            headers=headers,
-            json=data,
-            timeout=60
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            return result['candidates'][0]['content']['parts'][0]['text']
-        else:
-            logger.error(f"Gemini API error: {response.status_code}")
-            raise Exception(f"Gemini API failed with status {response.status_code}")
-            
-    except Exception as e:
-        logger.error(f"Error getting response from Gemini: {e}")
-        raise Exception(f"Failed to get Gemini response: {e}")
-
-async def get_anthropic_response_direct(word: str) -> str:
-    """Direct Anthropic response retrieval for brand analysis"""
-    try:
-        headers = {
-            "x-api-key": settings.anthropic_api_key,
-            "Content-Type": "application/json",
-            "anthropic-version": "2023-06-01"
-        }
-        
-        data = {
-            "model": settings.anthropic_model,
-            "max_tokens": 2000,
-            "messages": [{"role": "user", "content": word}]
-        }
-        
-        response = requests.post(
-            settings.anthropic_api_url,
-            headers=headers,
-            json=data,
-            timeout=60
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            return result['content'][0]['text']
-        else:
-            logger.error(f"Anthropic API error: {response.status_code}")
-            raise Exception(f"Anthropic API failed with status {response.status_code}")
-            
-    except Exception as e:
-        logger.error(f"Error getting response from Anthropic: {e}")
-        raise Exception(f"Failed to get Anthropic response: {e}")
-
-async def get_grok_response_direct(word: str) -> str:
-    """Direct Grok response retrieval for brand analysis"""
-    try:
-        headers = {
-            "Authorization": f"Bearer {settings.grok_api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        data = {
-            "model": settings.grok_model,
-            "messages": [{"role": "user", "content": word}],
-            "max_tokens": 2000,
-            "temperature": 0.7
-        }
-        
-        response = requests.post(
-            settings.grok_api_url,
-            headers=headers,
-            json=data,
-            timeout=60
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            return result['choices'][0]['message']['content']
-        else:
-            logger.error(f"Grok API error: {response.status_code}")
-            raise Exception(f"Grok API failed with status {response.status_code}")
-            
-    except Exception as e:
-        logger.error(f"Error getting response from Grok: {e}")
-        raise Exception(f"Failed to get Grok response: {e}")
-
-async def get_mistral_response_direct(word: str) -> str:
-    """Direct Mistral response retrieval for brand analysis"""
-    try:
-        headers = {
-            "Authorization": f"Bearer {settings.mistral_api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        data = {
-            "model": settings.mistral_model,
-            "messages": [{"role": "user", "content": word}],
-            "max_tokens": 2000,
-            "temperature": 0.7
-        }
-        
-        response = requests.post(
-            settings.mistral_api_url,
-            headers=headers,
-            json=data,
-            timeout=60
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            return result['choices'][0]['message']['content']
-        else:
-            logger.error(f"Mistral API error: {response.status_code}")
-            raise Exception(f"Mistral API failed with status {response.status_code}")
-            
-    except Exception as e:
-        logger.error(f"Error getting response from Mistral: {e}")
-        raise Exception(f"Failed to get Mistral response: {e}")
-
-async def get_perplexity_response_direct(word: str) -> str:
-    """Direct Perplexity response retrieval for brand analysis"""
-    try:
-        headers = {
-            "Authorization": f"Bearer {settings.perplexity_api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        data = {
-            "model": settings.perplexity_model,
-            "messages": [{"role": "user", "content": word}],
-            "max_tokens": 2000,
-            "temperature": 0.7
-        }
-        
-        response = requests.post(
-            settings.perplexity_api_url,
-            headers=headers,
-            json=data,
-            timeout=60
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            return result['choices'][0]['message']['content']
-        else:
-            logger.error(f"Perplexity API error: {response.status_code}")
-            raise Exception(f"Perplexity API failed with status {response.status_code}")
-            
-    except Exception as e:
-        logger.error(f"Error getting response from Perplexity: {e}")
-        raise Exception(f"Failed to get Perplexity response: {e}")
-
-async def get_openai_response_direct(word: str) -> str:
-    """Direct OpenAI response retrieval for brand analysis"""
-    try:
-        headers = {
-            "Authorization": f"Bearer {settings.openai_api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        data = {
-            "model": "gpt-4o-mini",
-            "messages": [{"role": "user", "content": word}],
-            "max_tokens": 2000,
-            "temperature": 0.7
-        }
-        
-        response = requests.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers=headers,
-            json=data,
-            timeout=60
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            return result['choices'][0]['message']['content']
-        else:
-            logger.error(f"OpenAI API error: {response.status_code}")
-            raise Exception(f"OpenAI API failed with status {response.status_code}")
-            
-    except Exception as e:
-        logger.error(f"Error getting response from OpenAI: {e}")
-        raise Exception(f"Failed to get OpenAI response: {e}")
-
-async def extract_companies_from_response_direct(llm_response: str) -> list:
-    """Direct company extraction from LLM response"""
-    try:
-        prompt = f"""
-        Analyze the following text and extract company names, brands, and organizations.
-        Return only a list of names separated by commas, without additional text.
-        
-        Text:
-        {llm_response}
-        """
-        
-        headers = {
-            "Authorization": f"Bearer {settings.openai_api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        data = {
-            "model": "gpt-4o-mini",
-            "messages": [{"role": "user", "content": prompt}],
-            "max_tokens": 2000,
-            "temperature": 0.3
-        }
-        
-        response = requests.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers=headers,
-            json=data,
-            timeout=60
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            companies_text = result['choices'][0]['message']['content']
-            companies = [c.strip() for c in companies_text.split(',') if c.strip()]
-            return companies[:10]  # Maximum 10 companies
-        else:
-            logger.error(f"OpenAI API error during company extraction: {response.status_code}")
-            raise Exception(f"OpenAI API failed during company extraction: {response.status_code}")
-            
-    except Exception as e:
-        logger.error(f"Error extracting companies: {e}")
-        raise Exception(f"Failed to extract companies: {e}")
+from openai_batch import ACTIVE_BATCH_STATUSES
+from app_cache import init_cache, close_cache, cache_get, cache_set, cache_delete
+from serp_refresh import (
+    STATS_CACHE_KEY, word_analytics_cache_key, invalidate_active_llms,
+    get_http_session, close_http_session, poll_serp_batches, run_refresh, fail_orphaned_jobs
+)
+import orjson
 
-async def update_serp_data_direct(db: AsyncSession, group_id: Optional[uuid.UUID] = None):
-    """Direct SERP data update without worker with brand monitoring support"""
-    try:
-        logger.info("🚀 Starting direct SERP data update")
-        
-        # Get active words
-        words_query = select(Word).where(Word.status == 1)
-        if group_id:
-            words_query = words_query.where(Word.group_id == group_id)
-        
-        words_result = await db.execute(words_query)
-        words = list(words_result.scalars().all())
-        
-        # Get active LLMs
-        llms_result = await db.execute(select(LLM).where(LLM.is_active == 1))
-        llms = list(llms_result.scalars().all())
-        
-        logger.info(f"Found {len(words)} words and {len(llms)} LLMs for processing")
-        
-        processed_count = 0
-        
-        for word in words:
-            for llm in llms:
-                try:
-                    # Check if data needs updating
-                    from datetime import timezone
-                    two_weeks_ago = datetime.now(timezone.utc) - timedelta(days=14)
-                    # Remove timezone for PostgreSQL comparison
-                    two_weeks_ago_naive = two_weeks_ago.replace(tzinfo=None)
-                    
-                    existing_serp = await db.scalar(
-                        select(WordSerp).where(
-                            and_(
-                                WordSerp.word_id == word.uuid,
-                                WordSerp.llm_id == llm.uuid,
-                                WordSerp.create_time > two_weeks_ago_naive
-                            )
-                        )
-                    )
-                    
-                    if existing_serp:
-                        logger.info(f"Word '{word.name}' with LLM '{llm.name}' already processed")
-                        continue
-                    
-                    logger.info(f"Processing word '{word.name}' with {llm.name}")
-                    
-                    # Get LLM response
-                    if llm.name.lower() == "openai":
-                        if not settings.openai_api_key:
-                            logger.error(f"OpenAI API key not configured, skipping LLM '{llm.name}'")
-                            continue
-                        llm_response = await get_openai_response_direct(word.name)
-                    elif llm.name.lower() == "gemini":
-                        if not settings.gemini_api_key:
-                            logger.error(f"Gemini API key not configured, skipping LLM '{llm.name}'")
-                            continue
-                        llm_response = await get_gemini_response_direct(word.name)
-                    elif llm.name.lower() == "anthropic":
-                        if not settings.anthropic_api_key:
-                            logger.error(f"Anthropic API key not configured, skipping LLM '{llm.name}'")
-                            continue
-                        llm_response = await get_anthropic_response_direct(word.name)
-                    elif llm.name.lower() == "grok":
-                        if not settings.grok_api_key:
-                            logger.error(f"Grok API key not configured, skipping LLM '{llm.name}'")
-                            continue
-                        llm_response = await get_grok_response_direct(word.name)
-                    elif llm.name.lower() == "mistral":
-                        if not settings.mistral_api_key:
-                            logger.error(f"Mistral API key not configured, skipping LLM '{llm.name}'")
-                            continue
-                        llm_response = await get_mistral_response_direct(word.name)
-                    elif llm.name.lower() == "perplexity":
-                        if not settings.perplexity_api_key:
-                            logger.error(f"Perplexity API key not configured, skipping LLM '{llm.name}'")
-                            continue
-                        llm_response = await get_perplexity_response_direct(word.name)
-                    else:
-                        logger.warning(f"LLM {llm.name} not implemented, skipping")
-                        continue
-                    
-                    if not llm_response:
-                        logger.warning(f"No response from {llm.name} for word '{word.name}'")
-                        continue
-                    
-                    # Save LLM response
-                    word_serp = WordSerp(
-                        content=llm_response,
-                        llm_id=llm.uuid,
-                        word_id=word.uuid,
-                        create_time=datetime.now(timezone.utc).replace(tzinfo=None)
-                    )
-                    
-                    db.add(word_serp)
-                    await db.flush()
-                    
-                    # Extract companies from LLM response
-                    companies = await extract_companies_from_response_direct(llm_response)
-                    
-                    # Save companies
-                    for company_name in companies:
-                        existing_company = await db.scalar(
-                            select(Company).where(
-                                Company.name == company_name,
-                                Company.serp_id == word_serp.uuid
-                            )
-                        )
-                        if not existing_company:
-                            new_company = Company(
-                                name=company_name,
-                                serp_id=word_serp.uuid
-                            )
-                            db.add(new_company)
-                    
-                    # Analyze brand mentions for this word group (if brand projects exist)
-                    if word.group_id:
-                        await analyze_brand_mentions_for_word_direct(word, word_serp, llm_response, db)
-                    
-                    processed_count += 1
-                    
-                    # Commit every 10 processed pairs
-                    if processed_count % 10 == 0:
-                        await db.commit()
-                        logger.info(f"Processed {processed_count} word-LLM pairs")
-                    
-                except Exception as e:
-                    logger.error(f"Error processing word '{word.name}' with LLM '{llm.name}': {e}")
-                    continue
-        
-        # Final commit
-        await db.commit()
-        logger.info(f"✅ SERP data update completed. Processed {processed_count} pairs, extracted companies and analyzed brands")
-        
-    except Exception as e:
-        logger.error(f"Error in direct SERP data update: {e}")
-        await db.rollback()
-        raise
+# === SERP REFRESH JOBS ===
 
-async def analyze_brand_mentions_for_word_direct(word, word_serp, llm_response, db):
-    """Analyze brand mentions in LLM response for specific word"""
-    try:
-        from datetime import timezone
-        
-        # Get all brand projects for this word's group
-        brand_projects = await db.execute(
-            select(BrandProject).where(BrandProject.word_group_id == word.group_id)
-        )
-        
-        for brand_project in brand_projects.scalars().all():
-            logger.info(f"🔍 Analyzing brand project: {brand_project.name} (brand: {brand_project.brand_name})")
-            
-            # Get competitors for this project
-            competitors = await db.execute(
-                select(Competitor).where(Competitor.project_id == brand_project.uuid)
-            )
-            competitors_list = list(competitors.scalars().all())
-            logger.info(f"📋 Found {len(competitors_list)} competitors: {[c.name for c in competitors_list]}")
-            
-            # Check brand and competitor mentions
-            brand_mentioned = brand_project.brand_name.lower() in llm_response.lower()
-            logger.info(f"🏷️ Brand '{brand_project.brand_name}' mentioned: {brand_mentioned}")
-            
-            # Always create a record for the brand project, even if no competitors
-            if not competitors_list:
-                logger.info("⚠️ No competitors found, creating brand-only mention record")
-                brand_mention = BrandMention(
-                    project_id=brand_project.uuid,
-                    serp_id=word_serp.uuid,
-                    brand_mentioned=1 if brand_mentioned else 0,
-                    mentioned_competitor=None,
-                    competitor_mentioned=0
-                )
-                db.add(brand_mention)
-                logger.info(f"✅ Created brand mention record: brand={brand_mentioned}")
-            
-            for competitor in competitors_list:
-                competitor_mentioned = competitor.name.lower() in llm_response.lower()
-                logger.info(f"🏢 Competitor '{competitor.name}' mentioned: {competitor_mentioned}")
-                
-                # Create mention record for each competitor (whether mentioned or not)
-                brand_mention = BrandMention(
-                    project_id=brand_project.uuid,
-                    serp_id=word_serp.uuid,
-                    brand_mentioned=1 if brand_mentioned else 0,
-                    mentioned_competitor=competitor.name,
-                    competitor_mentioned=1 if competitor_mentioned else 0
-                )
-                db.add(brand_mention)
-                logger.info(f"✅ Created mention record: brand={brand_mentioned}, competitor={competitor.name}, mentioned={competitor_mentioned}")
-                    
-    except Exception as e:
-        logger.error(f"Error analyzing brand mentions: {e}")
+async def _enqueue_refresh(
+    db: AsyncSession,
+    background_tasks: BackgroundTasks,
+    user: UserResponse,
+    group_id: Optional[uuid.UUID] = None,
+    use_batch: bool = False
+) -> SerpJob:
+    """Create SERP refresh job and schedule it after the response is sent"""
+    job = SerpJob(status="pending", group_id=group_id, user_id=user.uuid, use_batch=1 if use_batch else 0)
+    db.add(job)
+    await db.commit()
+    # With an external worker the pending row is the queue entry, picked up by serp_job_worker.py
+    if not settings.serp_jobs_external:
+        background_tasks.add_task(run_refresh, job.uuid, group_id, use_batch)
+    return job
 
 # Logging and monitoring setup
 setup_logging()
 if settings.sentry_dsn:
     setup_sentry()
 
+async def _sweep_orphaned_jobs():
+    """Fail in-process SERP jobs with an expired lease, every serp_job_lease_seconds"""
+    while True:
+        try:
+            failed_count = await fail_orphaned_jobs()
+            if failed_count:
+                logger.warning(f"⚠️ Marked {failed_count} interrupted SERP jobs as failed")
+        except Exception as e:
+            logger.warning(f"Failed to sweep interrupted SERP jobs: {e}")
+        await asyncio.sleep(settings.serp_job_lease_seconds)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifecycle management"""
@@ -498,10 +99,26 @@ async def lifespan(app: FastAPI):
     available_providers = llm_service.get_available_providers()
     logger.info(f"LLM Service initialized with providers: {available_providers}")
     
+    # Open shared HTTP session for direct LLM calls
+    get_http_session()
+    
+    # Connect API cache (Redis or in-process fallback)
+    await init_cache()
+    
+    # In-process jobs die with the process: fail the ones left by a previous run, then keep sweeping
+    # (a job interrupted just before this start still holds its lease for a while)
+    orphaned_jobs_sweeper = None
+    if not settings.serp_jobs_external:
+        orphaned_jobs_sweeper = asyncio.create_task(_sweep_orphaned_jobs())
+    
     yield
     
     # Shutdown
     logger.info("Shutting down SEO Analyzer API...")
+    if orphaned_jobs_sweeper:
+        orphaned_jobs_sweeper.cancel()
+    await close_http_session()
+    await close_cache()
     await close_database()
     logger.info("Database connections closed")
 
@@ -509,11 +126,19 @@ app = FastAPI(
     title="SEO Analyzer API",
     description="API for SEO keyword analysis with LLM integration",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # orjson encodes UUID/datetime natively and much faster than stdlib json
+    default_response_class=ORJSONResponse
 )
 
 # Add middleware
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Small JSON bodies are not worth gzip; a low level keeps most of the ratio on repetitive JSON for far less CPU
+if settings.gzip_enabled:
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=settings.gzip_minimum_size,
+        compresslevel=settings.gzip_compress_level
+    )
 app.add_middleware(
     TrustedHostMiddleware, 
     allowed_hosts=settings.allowed_hosts or ["*"]
@@ -542,8 +167,8 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
             detail="User with this email already exists"
         )
     
-    # Create new user
-    hashed_password = hash_password(user_data.password)
+    # Create new user (bcrypt is CPU-bound, run it off the event loop)
+    hashed_password = await asyncio.to_thread(hash_password, user_data.password)
     new_user = User(
         email=user_data.email,
         password=hashed_password
@@ -551,7 +176,6 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     
     db.add(new_user)
     await db.commit()
-    await db.refresh(new_user)
     
     return new_user
 
@@ -560,7 +184,7 @@ async def login(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
     """User authentication"""
     user = await db.scalar(select(User).where(User.email == user_data.email))
     
-    if not user or not verify_password(user_data.password, user.password):
+    if not user or not await asyncio.to_thread(verify_password, user_data.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -570,7 +194,7 @@ async def login(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.get("/api/auth/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: UserResponse = Depends(get_current_user)):
     """Get current user information"""
     return current_user
 
@@ -578,24 +202,29 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 
 @app.get("/api/word-groups", response_model=List[WordGroupResponse])
 async def get_word_groups(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db_ro),
+    current_user: UserResponse = Depends(get_current_user)
 ):
     """Get all user word groups"""
-    result = await db.execute(select(WordGroup).where(WordGroup.user_id == current_user.uuid))
-    return result.scalars().all()
+    user_id = current_user.uuid
+    result = await db.execute(lambda_stmt(
+        lambda: select(WordGroup.uuid, WordGroup.name, WordGroup.user_id, WordGroup.create_time)
+        .where(WordGroup.user_id == user_id)
+    ))
+    # Rows come straight from the DB in the response_model shape; encode them without per-item validation
+    return ORJSONResponse([dict(row._mapping) for row in result])
 
 @app.post("/api/word-groups", response_model=WordGroupResponse)
 async def create_word_group(
     group_data: WordGroupCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
     """Create new word group"""
     new_group = WordGroup(name=group_data.name, user_id=current_user.uuid)
     db.add(new_group)
     await db.commit()
-    await db.refresh(new_group)
+    await cache_delete(STATS_CACHE_KEY)
     return new_group
 
 @app.put("/api/word-groups/{group_id}", response_model=WordGroupResponse)
@@ -603,7 +232,7 @@ async def update_word_group(
     group_id: uuid.UUID,
     group_data: WordGroupUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
     """Update word group"""
     group = await db.scalar(select(WordGroup).where(
@@ -615,14 +244,13 @@ async def update_word_group(
     
     group.name = group_data.name
     await db.commit()
-    await db.refresh(group)
     return group
 
 @app.delete("/api/word-groups/{group_id}")
 async def delete_word_group(
     group_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
     """Delete word group"""
     group = await db.scalar(select(WordGroup).where(
@@ -634,6 +262,7 @@ async def delete_word_group(
     
     await db.delete(group)
     await db.commit()
+    await cache_delete(STATS_CACHE_KEY)
     return {"message": "Group deleted"}
 
 # === WORDS ===
@@ -641,22 +270,26 @@ async def delete_word_group(
 @app.get("/api/words", response_model=List[WordResponse])
 async def get_words(
     group_id: Optional[uuid.UUID] = None,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db_ro),
+    current_user: UserResponse = Depends(get_current_user)
 ):
     """Get all words or words from specific group"""
-    query = select(Word).where(Word.status == 1)
+    # lambda_stmt caches the compiled SQL; only the bound parameters change per request
+    query = lambda_stmt(
+        lambda: select(Word.uuid, Word.name, Word.group_id, Word.create_time, Word.update_time, Word.status)
+        .where(Word.status == 1)
+    )
     if group_id:
-        query = query.where(Word.group_id == group_id)
+        query += lambda s: s.where(Word.group_id == group_id)
     
     result = await db.execute(query)
-    return result.scalars().all()
+    return ORJSONResponse([dict(row._mapping) for row in result])
 
 @app.post("/api/words", response_model=WordResponse)
 async def create_word(
     word_data: WordCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
     """Create new word"""
     new_word = Word(
@@ -665,7 +298,7 @@ async def create_word(
     )
     db.add(new_word)
     await db.commit()
-    await db.refresh(new_word)
+    await cache_delete(STATS_CACHE_KEY)
     return new_word
 
 @app.put("/api/words/{word_id}", response_model=WordResponse)
@@ -673,7 +306,7 @@ async def update_word(
     word_id: uuid.UUID,
     word_data: WordUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
     """Update word"""
     word = await db.scalar(select(Word).where(Word.uuid == word_id))
@@ -688,14 +321,16 @@ async def update_word(
         word.status = word_data.status
     
     await db.commit()
-    await db.refresh(word)
+    if word_data.status is not None:
+        await cache_delete(STATS_CACHE_KEY)
+    await cache_delete(word_analytics_cache_key(word_id))
     return word
 
 @app.delete("/api/words/{word_id}")
 async def delete_word(
     word_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
     """Soft delete word"""
     word = await db.scalar(select(Word).where(Word.uuid == word_id))
@@ -704,24 +339,27 @@ async def delete_word(
     
     word.status = 0  # Soft delete
     await db.commit()
+    await cache_delete(STATS_CACHE_KEY)
+    await cache_delete(word_analytics_cache_key(word_id))
     return {"message": "Word deleted"}
 
 # === LLM PROVIDERS ===
 
 @app.get("/api/llm", response_model=List[LLMResponse])
 async def get_llm_providers(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db_ro),
+    current_user: UserResponse = Depends(get_current_user)
 ):
     """Get all LLM providers"""
-    result = await db.execute(select(LLM))
-    return result.scalars().all()
+    # api_key is not part of LLMResponse and is never selected
+    result = await db.execute(lambda_stmt(lambda: select(LLM.uuid, LLM.name, LLM.api_url, LLM.is_active)))
+    return ORJSONResponse([dict(row._mapping) for row in result])
 
 @app.post("/api/llm", response_model=LLMResponse)
 async def create_llm_provider(
     llm_data: LLMCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
     """Create new LLM provider"""
     new_llm = LLM(
@@ -731,133 +369,156 @@ async def create_llm_provider(
     )
     db.add(new_llm)
     await db.commit()
-    await db.refresh(new_llm)
+    invalidate_active_llms()
     return new_llm
 
 # === АНАЛИТИКА ===
 
+async def _fetch_all_in_new_session(stmt, session_factory=AsyncSessionLocal) -> list:
+    """Execute a read-only statement on its own session so independent queries can be gathered"""
+    async with session_factory() as session:
+        result = await session.execute(stmt)
+        return result.all()
+
+async def _fetch_all_rows(db: AsyncSession, *stmts, session_factory=AsyncSessionLocal) -> list:
+    """Rows of each independent read-only statement, in order.
+    With a connection pool (DB_POOL_SIZE > 0) they run concurrently: the first on db, the rest on their own sessions.
+    With NullPool (Supabase pooler) every extra session is a new TCP+TLS connection, which costs more
+    than the round-trip it saves, so they run sequentially on db."""
+    if settings.db_pool_size <= 0:
+        return [(await db.execute(stmt)).all() for stmt in stmts]
+    
+    async def fetch_first() -> list:
+        return (await db.execute(stmts[0])).all()
+    
+    return await asyncio.gather(
+        fetch_first(),
+        *(_fetch_all_in_new_session(stmt, session_factory) for stmt in stmts[1:])
+    )
+
+# Analytics only render a preview of the LLM answer
+SERP_PREVIEW_LENGTH = 100
+
 async def _get_word_analytics_data(
     word_id: uuid.UUID,
     db: AsyncSession
-) -> WordAnalytics:
-    """Internal function to get word analytics"""
-    try:
-        word = await db.scalar(select(Word).where(Word.uuid == word_id))
-        if not word:
-            raise HTTPException(status_code=404, detail="Word not found")
-        
-        # Get SERP results
-        serp_results = await db.execute(
-            select(WordSerp).where(WordSerp.word_id == word_id)
+) -> Optional[dict]:
+    """Load a word, its SERP results and their companies with three independent queries.
+    Returns plain dicts (word, serp_results with content previews, companies), ready for orjson."""
+    # The queries only depend on word_id and run concurrently when a connection pool is configured.
+    # Plain column rows are enough for the response, no ORM instances are built.
+    word_rows, serp_rows, company_rows = await _fetch_all_rows(
+        db,
+        select(Word.uuid, Word.name, Word.group_id, Word.status, Word.create_time)
+        .where(Word.uuid == word_id),
+        # Truncate on the DB side so full LLM answers never leave the database
+        select(
+            WordSerp.uuid,
+            func.substr(WordSerp.content, 1, SERP_PREVIEW_LENGTH).label("content_preview"),
+            func.length(WordSerp.content).label("content_len"),
+            WordSerp.llm_id,
+            WordSerp.create_time
         )
-        serp_list = list(serp_results.scalars().all())
-        
-        # Get companies (without JOIN for simplicity)
-        companies_list = []
-        if serp_list:
-            for serp in serp_list:
-                companies_result = await db.execute(
-                    select(Company).where(Company.serp_id == serp.uuid)
-                )
-                companies_list.extend(companies_result.scalars().all())
-        
-        return WordAnalytics(
-            word=word,
-            serp_results=serp_list,
-            companies=companies_list
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting word analytics {word_id}: {e}")
-        raise HTTPException(status_code=500, detail=f"Error getting analytics: {str(e)}")
+        .where(WordSerp.word_id == word_id),
+        select(Company.uuid, Company.name, Company.serp_id)
+        .join(WordSerp, Company.serp_id == WordSerp.uuid)
+        .where(WordSerp.word_id == word_id),
+        session_factory=AsyncSessionLocalRO
+    )
+    if not word_rows:
+        return None
+    word = word_rows[0]
+    
+    return {
+        "word": dict(word._mapping),
+        "serp_results": [
+            {
+                "uuid": serp.uuid,
+                "content": serp.content_preview + "..." if serp.content_len > SERP_PREVIEW_LENGTH else serp.content_preview,
+                "llm_id": serp.llm_id,
+                "create_time": serp.create_time
+            }
+            for serp in serp_rows
+        ],
+        "companies": [dict(company._mapping) for company in company_rows]
+    }
+
+# Loads in progress per word: concurrent identical requests await the same load instead of querying again
+_word_analytics_inflight: dict = {}
+
+async def _load_word_analytics(word_id: uuid.UUID) -> Optional[dict]:
+    """Read-through: app_cache first, then a single shared DB load per word across concurrent requests"""
+    cache_key = word_analytics_cache_key(word_id)
+    cached_analytics = await cache_get(cache_key)
+    if cached_analytics is not None:
+        return cached_analytics
+
+    task = _word_analytics_inflight.get(word_id)
+    if task is None:
+        async def load() -> Optional[dict]:
+            # Own session: the load outlives whichever request started it
+            async with AsyncSessionLocalRO() as session:
+                analytics = await _get_word_analytics_data(word_id, session)
+            if analytics is not None and settings.word_analytics_cache_ttl_seconds > 0:
+                await cache_set(cache_key, analytics, settings.word_analytics_cache_ttl_seconds)
+            return analytics
+
+        task = asyncio.create_task(load())
+        _word_analytics_inflight[word_id] = task
+        task.add_done_callback(lambda _: _word_analytics_inflight.pop(word_id, None))
+    # A cancelled request must not cancel the load other requests are waiting on
+    return await asyncio.shield(task)
 
 @app.get("/api/analytics/word/{word_id}")
 async def get_word_analytics(
     word_id: uuid.UUID,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
     """Get analytics for specific word"""
     try:
         logger.info(f"Getting analytics for word: {word_id}")
         
-        # Get word
-        word = await db.scalar(select(Word).where(Word.uuid == word_id))
-        if not word:
+        analytics = await _load_word_analytics(word_id)
+        if analytics is None:
             logger.warning(f"Word {word_id} not found")
             return {"error": "Word not found"}
 
-        logger.info(f"Word found: {word.name}")
-
-        # Get SERP results
-        serp_results = await db.execute(select(WordSerp).where(WordSerp.word_id == word_id))
-        serp_list = list(serp_results.scalars().all())
-
-        # Get companies
-        companies_list = []
-        for serp in serp_list:
-            companies_result = await db.execute(select(Company).where(Company.serp_id == serp.uuid))
-            companies_list.extend(companies_result.scalars().all())
-
-        logger.info(f"Found SERP: {len(serp_list)}, companies: {len(companies_list)}")
+        logger.info(f"Word found: {analytics['word']['name']}")
+        logger.info(f"Found SERP: {len(analytics['serp_results'])}, companies: {len(analytics['companies'])}")
 
-        # Return simple structure
-        return {
-            "word": {
-                "uuid": str(word.uuid),
-                "name": word.name,
-                "group_id": str(word.group_id) if word.group_id else None,
-                "status": word.status,
-                "create_time": word.create_time.isoformat() if word.create_time else None
-            },
-            "serp_results": [
-                {
-                    "uuid": str(serp.uuid),
-                    "content": serp.content[:100] + "..." if len(serp.content) > 100 else serp.content,
-                    "llm_id": str(serp.llm_id) if serp.llm_id else None,
-                    "create_time": serp.create_time.isoformat() if serp.create_time else None
-                } for serp in serp_list
-            ],
-            "companies": [
-                {
-                    "uuid": str(company.uuid),
-                    "name": company.name,
-                    "serp_id": str(company.serp_id) if company.serp_id else None
-                } for company in companies_list
-            ]
-        }
+        # orjson serializes UUID and datetime natively, skip jsonable_encoder
+        return ORJSONResponse(analytics)
         
     except Exception as e:
-        logger.error(f"Error getting word analytics {word_id}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"Error getting word analytics {word_id}: {e}")
         return {"error": f"Error: {str(e)}"}
 
-@app.post("/api/analytics/start")
+@app.post("/api/analytics/start", status_code=status.HTTP_202_ACCEPTED)
 async def start_analytics(
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
     """Start general analytics"""
     try:
-        # Direct SERP data update without worker
-        await update_serp_data_direct(db)
-        return {"message": "Analytics started", "status": "started"}
+        # SERP data update runs in background, progress via /api/jobs/{job_id}
+        job = await _enqueue_refresh(db, background_tasks, current_user, use_batch=True)
+        return {"message": "Analytics started", "status": "started", "job_id": str(job.uuid)}
     except Exception as e:
         logger.error(f"Error starting analytics: {e}")
         raise HTTPException(status_code=500, detail=f"Error starting analytics: {str(e)}")
 
-@app.post("/api/analytics/group/start")
+@app.post("/api/analytics/group/start", status_code=status.HTTP_202_ACCEPTED)
 async def start_group_analytics(
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
     """Start analytics for all groups"""
     try:
-        # Direct SERP data update without worker
-        await update_serp_data_direct(db)
-        return {"message": "Group analytics started", "status": "started"}
+        # SERP data update runs in background, progress via /api/jobs/{job_id}
+        job = await _enqueue_refresh(db, background_tasks, current_user)
+        return {"message": "Group analytics started", "status": "started", "job_id": str(job.uuid)}
     except Exception as e:
         logger.error(f"Error starting group analytics: {e}")
         raise HTTPException(status_code=500, detail=f"Error starting group analytics: {str(e)}")
@@ -865,19 +526,29 @@ async def start_group_analytics(
 @app.post("/api/analytics/group/{group_id}/start")
 async def start_group_analytics_by_id(
     group_id: uuid.UUID,
+    background_tasks: BackgroundTasks,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
-    """Start brand analysis for specific word group"""
+    """
+    Start brand analysis for specific word group.
+    SERP update runs in background; analysis_results reflect data collected so far.
+    202 Accepted only when a refresh job was created, 200 when there was nothing to enqueue.
+    """
     try:
         # Check group existence
-        group = await db.scalar(select(WordGroup).where(WordGroup.uuid == group_id))
+        group = await db.scalar(
+            select(WordGroup).options(raiseload("*")).where(WordGroup.uuid == group_id)
+        )
         if not group:
             raise HTTPException(status_code=404, detail="Group not found")
         
-        # Check if there are brand projects for this group
+        # Check if there are brand projects for this group (competitors are listed in the result)
         brand_projects = await db.execute(
-            select(BrandProject).where(BrandProject.word_group_id == group_id)
+            select(BrandProject)
+            .options(*_brand_project_load_options())
+            .where(BrandProject.word_group_id == group_id)
         )
         brand_projects_list = list(brand_projects.scalars().all())
         
@@ -891,43 +562,73 @@ async def start_group_analytics_by_id(
         
         logger.info(f"Starting brand analysis for group {group.name} with {len(brand_projects_list)} brand projects")
         
-        # Run SERP data update and brand analysis
-        await update_serp_data_direct(db, group_id=group_id)
+        # Fresh groups often have no active words yet - nothing to update or extract
+        active_words_count = await db.scalar(
+            select(func.count()).select_from(Word).where(Word.group_id == group_id, Word.status == 1)
+        )
+        
+        job = None
+        if active_words_count:
+            # SERP data update and brand analysis run in background
+            job = await _enqueue_refresh(db, background_tasks, current_user, group_id=group_id)
+            response.status_code = status.HTTP_202_ACCEPTED
+        else:
+            logger.info(f"No active words in group {group.name}, skipping SERP update")
+        
+        # Mention stats and extracted companies are independent (concurrent when a pool is configured)
+        project_ids = [project.uuid for project in brand_projects_list]
+        mentions_stmt = (
+            select(
+                BrandMention.project_id,
+                BrandMention.mentioned_competitor,
+                func.count().label("total"),
+                func.sum(case((BrandMention.brand_mentioned == 1, 1), else_=0)).label("brand"),
+                func.sum(case((BrandMention.competitor_mentioned == 1, 1), else_=0)).label("competitor")
+            )
+            .where(BrandMention.project_id.in_(project_ids))
+            .group_by(BrandMention.project_id, BrandMention.mentioned_competitor)
+        )
+        companies_stmt = (
+            select(Company.name)
+            .join(WordSerp, Company.serp_id == WordSerp.uuid)
+            .join(Word, WordSerp.word_id == Word.uuid)
+            .where(Word.group_id == group_id, Word.status == 1)
+            .distinct()
+        )
+        if active_words_count:
+            mentions_rows, companies_rows = await _fetch_all_rows(db, mentions_stmt, companies_stmt)
+        else:
+            mentions_rows = (await db.execute(mentions_stmt)).all()
+            companies_rows = []
         
-        # Get analysis results including company extraction
         total_mentions = 0
         brand_mentions = 0
         competitor_mentions = 0
-        extracted_companies = set()
         tracked_brands = []
         tracked_competitors = []
         
+        project_stats = {}
+        for row in mentions_rows:
+            stats = project_stats.setdefault(row.project_id, {"brand": 0, "competitors": {}})
+            total_mentions += row.total
+            brand_mentions += row.brand or 0
+            competitor_mentions += row.competitor or 0
+            stats["brand"] += row.brand or 0
+            if row.mentioned_competitor:
+                stats["competitors"][row.mentioned_competitor] = row.competitor or 0
+        
         for project in brand_projects_list:
-            # Get brand mentions for this project
-            mentions_result = await db.execute(
-                select(BrandMention).where(BrandMention.project_id == project.uuid)
-            )
-            mentions = list(mentions_result.scalars().all())
-            
-            total_mentions += len(mentions)
-            brand_mentions += sum(1 for m in mentions if m.brand_mentioned)
-            competitor_mentions += sum(1 for m in mentions if m.competitor_mentioned)
+            stats = project_stats.get(project.uuid, {"brand": 0, "competitors": {}})
             
             # Track brands and competitors for this project
             tracked_brands.append({
                 "brand_name": project.brand_name,
-                "mentions": sum(1 for m in mentions if m.brand_mentioned),
+                "mentions": stats["brand"],
                 "project_name": project.name
             })
             
-            # Get competitors for this project
-            competitors_result = await db.execute(
-                select(Competitor).where(Competitor.project_id == project.uuid)
-            )
-            competitors = list(competitors_result.scalars().all())
-            
-            for competitor in competitors:
-                competitor_mention_count = sum(1 for m in mentions if m.competitor_mentioned and m.mentioned_competitor == competitor.name)
+            for competitor in project.competitors:
+                competitor_mention_count = stats["competitors"].get(competitor.name, 0)
                 if competitor_mention_count > 0:
                     tracked_competitors.append({
                         "competitor_name": competitor.name,
@@ -935,31 +636,12 @@ async def start_group_analytics_by_id(
                         "project_name": project.name
                     })
         
-        # Get all companies extracted from LLM responses for this group
-        words_in_group = await db.execute(
-            select(Word).where(Word.group_id == group_id, Word.status == 1)
-        )
-        words_list = list(words_in_group.scalars().all())
-        
-        for word in words_list:
-            # Get SERP results for this word
-            serp_results = await db.execute(
-                select(WordSerp).where(WordSerp.word_id == word.uuid)
-            )
-            serp_list = list(serp_results.scalars().all())
-            
-            # Get companies extracted from these SERP results
-            for serp in serp_list:
-                companies_result = await db.execute(
-                    select(Company).where(Company.serp_id == serp.uuid)
-                )
-                companies = list(companies_result.scalars().all())
-                for company in companies:
-                    extracted_companies.add(company.name)
+        extracted_companies = {row.name for row in companies_rows}
         
         return {
-            "message": f"Brand analysis for group {group.name} completed",
-            "status": "completed",
+            "message": f"Brand analysis for group {group.name} started" if job else f"Brand analysis for group {group.name} completed",
+            "status": "started" if job else "completed",
+            "job_id": str(job.uuid) if job else None,
             "group_name": group.name,
             "brand_projects_count": len(brand_projects_list),
             "analysis_results": {
@@ -982,180 +664,294 @@ async def start_group_analytics_by_id(
 @app.get("/api/analytics/group/{group_id}")
 async def get_group_analytics(
     group_id: uuid.UUID,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db_ro),
+    current_user: UserResponse = Depends(get_current_user)
 ):
-    """Get analytics for word group"""
+    """Get analytics for word group (words are streamed to the client as they are read)"""
     try:
         logger.info(f"Getting analytics for group: {group_id}")
         
-        # Get group
-        group = await db.scalar(select(WordGroup).where(WordGroup.uuid == group_id))
+        group = (await db.execute(
+            select(WordGroup.uuid, WordGroup.name).where(WordGroup.uuid == group_id)
+        )).one_or_none()
         if not group:
             logger.warning(f"Group {group_id} not found")
             return {"error": "Group not found"}
         
         logger.info(f"Group found: {group.name}")
         
-        # Get words in group
-        words_result = await db.execute(select(Word).where(Word.group_id == group_id))
-        words_list = list(words_result.scalars().all())
+        # Unique company names per word
+        companies_result = await db.execute(
+            select(WordSerp.word_id, Company.name)
+            .join(Company, Company.serp_id == WordSerp.uuid)
+            .join(Word, Word.uuid == WordSerp.word_id)
+            .where(Word.group_id == group_id)
+            .distinct()
+        )
+        companies_by_word = {}
+        for word_id, company_name in companies_result:
+            companies_by_word.setdefault(word_id, []).append({"name": company_name})
         
-        logger.info(f"Found words in group: {len(words_list)}")
+        # Brand project for this group: competitors and mention totals per word
+        brand_project_id = await db.scalar(
+            select(BrandProject.uuid).where(BrandProject.word_group_id == group_id).limit(1)
+        )
+        competitors_data = []
+        mentions_by_word = {}
+        if brand_project_id:
+            competitors_result = await db.execute(
+                select(Competitor.name).where(Competitor.project_id == brand_project_id)
+            )
+            competitors_data = [{"name": name} for name in competitors_result.scalars()]
+            
+            mentions_result = await db.execute(
+                select(
+                    WordSerp.word_id,
+                    func.count(case((BrandMention.brand_mentioned == 1, 1))).label("brand_mentions"),
+                    func.count(case((BrandMention.competitor_mentioned == 1, 1))).label("competitor_mentions"),
+                    func.max(BrandMention.create_time).label("last_analysis_date")
+                )
+                .join(BrandMention, BrandMention.serp_id == WordSerp.uuid)
+                .join(Word, Word.uuid == WordSerp.word_id)
+                .where(Word.group_id == group_id, BrandMention.project_id == brand_project_id)
+                .group_by(WordSerp.word_id)
+            )
+            mentions_by_word = {row.word_id: row for row in mentions_result}
         
-        # Get brand project for this group to get competitors
-        brand_project = await db.scalar(select(BrandProject).where(BrandProject.word_group_id == group_id))
+        # Words with their SERP counts in one aggregated query, read through a server-side cursor
+        words_stmt = (
+            select(
+                Word.uuid, Word.name, Word.status, Word.create_time,
+                func.count(WordSerp.uuid).label("serp_count")
+            )
+            .select_from(Word)
+            .outerjoin(WordSerp, WordSerp.word_id == Word.uuid)
+            .where(Word.group_id == group_id)
+            .group_by(Word.uuid)
+            .order_by(Word.create_time)
+            .execution_options(yield_per=500)
+        )
+    except Exception as e:
+        logger.exception(f"Error getting group analytics {group_id}: {e}")
+        return {"error": f"Error: {str(e)}"}
+    
+    # The cursor gets its own session that lives exactly as long as the response body:
+    # the request session (a yield dependency) is not guaranteed to outlive the handler.
+    # The first partition is fetched before returning, so query errors surface before the 200 is sent
+    stream_session = AsyncSessionLocalRO()
+    try:
+        words_partitions = (await stream_session.stream(words_stmt)).partitions()
+        try:
+            first_partition = await words_partitions.__anext__()
+        except StopAsyncIteration:
+            first_partition = []
+    except Exception as e:
+        await stream_session.close()
+        logger.exception(f"Error getting group analytics {group_id}: {e}")
+        return {"error": f"Error: {str(e)}"}
+    
+    def word_analytics(word) -> dict:
+        companies_data = companies_by_word.get(word.uuid, [])
+        mentions = mentions_by_word.get(word.uuid)
         
-        # Build analytics for each word
-        words_analytics = []
-        for word in words_list:
-            # Get SERP for each word
-            serp_results = await db.execute(select(WordSerp).where(WordSerp.word_id == word.uuid))
-            serp_list = list(serp_results.scalars().all())
-            
-            # Get companies from all SERP results for this word
-            companies_list = []
-            for serp in serp_list:
-                companies_result = await db.execute(select(Company).where(Company.serp_id == serp.uuid))
-                companies_list.extend(companies_result.scalars().all())
-            
-            # Get unique companies
-            unique_companies = {}
-            for company in companies_list:
-                unique_companies[company.name] = company
-            companies_data = [{"name": name} for name in unique_companies.keys()]
-            
-            # Get competitors from brand project
-            competitors_data = []
-            if brand_project:
-                competitors_result = await db.execute(select(Competitor).where(Competitor.project_id == brand_project.uuid))
-                competitors_list = list(competitors_result.scalars().all())
-                competitors_data = [{"name": competitor.name} for competitor in competitors_list]
-            
-            # Get brand mentions data
-            latest_brand_mentions = 0
-            latest_competitor_mentions = 0
-            last_analysis_date = None
-            
-            if brand_project:
-                # Get latest brand mentions for this word's SERP results
-                for serp in serp_list:
-                    brand_mentions_result = await db.execute(
-                        select(BrandMention).where(
-                            BrandMention.serp_id == serp.uuid,
-                            BrandMention.project_id == brand_project.uuid
-                        )
-                    )
-                    brand_mentions_list = list(brand_mentions_result.scalars().all())
-                    
-                    for mention in brand_mentions_list:
-                        if mention.brand_mentioned == 1:
-                            latest_brand_mentions += 1
-                        if mention.competitor_mentioned == 1:
-                            latest_competitor_mentions += 1
-                        
-                        # Update last analysis date
-                        if mention.create_time and (not last_analysis_date or mention.create_time > last_analysis_date):
-                            last_analysis_date = mention.create_time
-            
-            # Calculate changes (simplified - using current values as we don't have historical data structure)
-            # In a real implementation, you would compare with previous period data
-            brand_mentions_change = 0  # Would need historical comparison
-            competitor_mentions_change = 0  # Would need historical comparison
-            companies_change = len(companies_data)  # Assuming all companies are new for now
-            
-            words_analytics.append({
-                "word": {
-                    "uuid": str(word.uuid),
-                    "name": word.name,
-                    "status": word.status,
-                    "create_time": word.create_time.isoformat() if word.create_time else None
-                },
-                "serp_count": len(serp_list),
-                "companies_count": len(companies_data),
-                "companies": companies_data,
-                "competitors": competitors_data,
-                "latest_brand_mentions": latest_brand_mentions,
-                "latest_competitor_mentions": latest_competitor_mentions,
-                "brand_mentions_change": brand_mentions_change,
-                "competitor_mentions_change": competitor_mentions_change,
-                "companies_change": companies_change,
-                "last_analysis_date": last_analysis_date.isoformat() if last_analysis_date else None
-            })
+        # Calculate changes (simplified - using current values as we don't have historical data structure)
+        # In a real implementation, you would compare with previous period data
+        brand_mentions_change = 0  # Would need historical comparison
+        competitor_mentions_change = 0  # Would need historical comparison
+        companies_change = len(companies_data)  # Assuming all companies are new for now
         
         return {
-            "group": {
-                "uuid": str(group.uuid),
-                "name": group.name
+            "word": {
+                "uuid": word.uuid,
+                "name": word.name,
+                "status": word.status,
+                "create_time": word.create_time
             },
-            "words": words_analytics,
-            "words_count": len(words_list)
+            "serp_count": word.serp_count,
+            "companies_count": len(companies_data),
+            "companies": companies_data,
+            "competitors": competitors_data,
+            "latest_brand_mentions": mentions.brand_mentions if mentions else 0,
+            "latest_competitor_mentions": mentions.competitor_mentions if mentions else 0,
+            "brand_mentions_change": brand_mentions_change,
+            "competitor_mentions_change": competitor_mentions_change,
+            "companies_change": companies_change,
+            "last_analysis_date": mentions.last_analysis_date if mentions else None
         }
-        
-    except Exception as e:
-        logger.error(f"Error getting group analytics {group_id}: {e}")
-        import traceback
-        traceback.print_exc()
-        return {"error": f"Error: {str(e)}"}
+    
+    async def partitions():
+        if first_partition:
+            yield first_partition
+            async for partition in words_partitions:
+                yield partition
+    
+    async def body():
+        try:
+            yield b'{"group":' + orjson.dumps({"uuid": group.uuid, "name": group.name}) + b',"words":['
+            words_count = 0
+            async for partition in partitions():
+                chunk = b",".join(orjson.dumps(word_analytics(word)) for word in partition)
+                yield (b"," if words_count else b"") + chunk
+                words_count += len(partition)
+        except Exception as e:
+            # Headers are already sent: the client gets truncated JSON, the error is only in the log
+            logger.exception(f"Error streaming group analytics {group_id}: {e}")
+            raise
+        finally:
+            await stream_session.close()
+        logger.info(f"Streamed analytics for {words_count} words in group {group_id}")
+        yield b'],"words_count":' + str(words_count).encode() + b"}"
+    
+    return StreamingResponse(body(), media_type="application/json")
 
 
-@app.post("/api/serp/update")
+@app.post("/api/serp/update", status_code=status.HTTP_202_ACCEPTED)
 async def update_serp_data(
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
     """Start SERP data update cycle"""
     try:
-        # Direct SERP data update without worker
-        await update_serp_data_direct(db)
-        return {"message": "SERP data update cycle started"}
+        # SERP data update runs in background, progress via /api/jobs/{job_id}
+        job = await _enqueue_refresh(db, background_tasks, current_user, use_batch=True)
+        return {"message": "SERP data update cycle started", "job_id": str(job.uuid)}
     except Exception as e:
         logger.error(f"Error updating SERP data: {e}")
         raise HTTPException(status_code=500, detail=f"Error updating SERP data: {str(e)}")
 
+@app.post("/api/serp/batches/poll")
+async def poll_serp_batches_endpoint(
+    db: AsyncSession = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Check OpenAI batches and save results of completed ones"""
+    try:
+        processed_count = await poll_serp_batches(db)
+        pending_result = await db.execute(
+            select(func.count()).select_from(SerpBatch).where(SerpBatch.status.in_(ACTIVE_BATCH_STATUSES))
+        )
+        return {"processed": processed_count, "pending_batches": pending_result.scalar()}
+    except Exception as e:
+        logger.error(f"Error polling SERP batches: {e}")
+        raise HTTPException(status_code=500, detail=f"Error polling SERP batches: {str(e)}")
+
+@app.get("/api/jobs/{job_id}", response_model=SerpJobResponse)
+async def get_serp_job(
+    job_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Get SERP refresh job progress"""
+    job = await db.scalar(
+        select(SerpJob).where(SerpJob.uuid == job_id, SerpJob.user_id == current_user.uuid)
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
 # === STATISTICS ===
 
 @app.get("/api/stats")
 async def get_stats(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db_ro),
+    current_user: UserResponse = Depends(get_current_user)
 ):
     """Get general statistics"""
-    # Count various entities
-    words_count = await db.scalar(select(func.count(Word.uuid)).where(Word.status == 1))
-    groups_count = await db.scalar(select(func.count(WordGroup.uuid)))
-    serp_count = await db.scalar(select(func.count(WordSerp.uuid)))
-    companies_count = await db.scalar(select(func.count(Company.uuid)))
+    cached_stats = await cache_get(STATS_CACHE_KEY)
+    if cached_stats is not None:
+        return cached_stats
     
-    return {
-        "words_count": words_count,
-        "groups_count": groups_count,
-        "serp_results_count": serp_count,
-        "companies_count": companies_count
-    }
+    # Count various entities in one round-trip (independent scalar subqueries)
+    result = await db.execute(
+        select(
+            select(func.count()).select_from(Word).where(Word.status == 1).scalar_subquery().label("words_count"),
+            select(func.count()).select_from(WordGroup).scalar_subquery().label("groups_count"),
+            select(func.count()).select_from(WordSerp).scalar_subquery().label("serp_results_count"),
+            select(func.count()).select_from(Company).scalar_subquery().label("companies_count")
+        )
+    )
+    stats = dict(result.one()._mapping)
+    await cache_set(STATS_CACHE_KEY, stats, settings.stats_cache_ttl_seconds)
+    return stats
 
 # === BRAND MONITORING ===
 
+def _brand_project_load_options():
+    """Competitors in one IN query; any other relationship access raises instead of lazy loading"""
+    return (
+        selectinload(BrandProject.competitors).raiseload("*"),
+        raiseload("*"),
+    )
+
+MAX_COMPETITORS = 10
+
+def _prepare_competitors(names: Optional[List[str]]) -> List[str]:
+    """Strip names, drop blanks and case-insensitive duplicates, keep the first MAX_COMPETITORS"""
+    unique = {}
+    for name in names or []:
+        name = name.strip() if name else ""
+        if name:
+            unique.setdefault(name.lower(), name)
+    return list(unique.values())[:MAX_COMPETITORS]
+
+async def _insert_competitors(db: AsyncSession, project_id: uuid.UUID, names: Optional[List[str]]) -> list:
+    """Insert normalized competitors with one multi-row INSERT ... RETURNING"""
+    rows = [
+        {"uuid": uuid.uuid4(), "name": name, "project_id": project_id}
+        for name in _prepare_competitors(names)
+    ]
+    if not rows:
+        return []
+    result = await db.execute(
+        insert(Competitor)
+        .values(rows)
+        .returning(Competitor.uuid, Competitor.name, Competitor.create_time)
+    )
+    return result.all()
+
+def _brand_project_response(project: BrandProject, competitors, status_code: int = 200) -> ORJSONResponse:
+    """BrandProjectResponse payload from plain rows (RETURNING or column selects), not loaded collections.
+    Values come from the database already typed: the payload is encoded by orjson directly, without
+    building and re-validating the response model (response_model on the routes is for the OpenAPI schema)."""
+    return ORJSONResponse(_brand_project_payload(project, competitors), status_code=status_code)
+
+def _brand_project_payload(project: BrandProject, competitors) -> dict:
+    return {
+        "uuid": project.uuid,
+        "name": project.name,
+        "brand_name": project.brand_name,
+        "brand_description": project.brand_description,
+        "keywords_count": project.keywords_count,
+        "user_id": project.user_id,
+        "word_group_id": project.word_group_id,
+        "create_time": project.create_time,
+        "status": project.status,
+        "competitors": [
+            {"uuid": c.uuid, "name": c.name, "create_time": c.create_time}
+            for c in competitors
+        ]
+    }
+
 @app.post("/api/brand-projects", response_model=BrandProjectResponse, status_code=201)
 async def create_brand_project(
     project_data: BrandProjectCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
     try:
-        # Debug logging
-        logger.info(f"Creating brand project with word_group_id: {project_data.word_group_id}")
+        # Debug logging (loguru formats arguments only if the record is emitted)
+        logger.debug("Creating brand project with word_group_id: {}", project_data.word_group_id)
         
         # Check word group existence if specified
         if project_data.word_group_id:
-            group_result = await db.execute(
-                select(WordGroup).where(WordGroup.uuid == project_data.word_group_id)
+            group_exists = await db.scalar(
+                select(exists().where(WordGroup.uuid == project_data.word_group_id))
             )
-            word_group = group_result.scalar_one_or_none()
-            if not word_group:
+            if not group_exists:
                 logger.warning(f"Word group with ID {project_data.word_group_id} not found")
                 raise HTTPException(status_code=400, detail="Word group not found")
-            logger.info(f"Found word group: {word_group.name}")
+            logger.debug("Found word group: {}", project_data.word_group_id)
         
         # 1. Create project
         brand_project = BrandProject(
@@ -1170,59 +966,22 @@ async def create_brand_project(
         await db.flush()
         
         # Logging after creation
-        logger.info(f"Brand project created with UUID: {brand_project.uuid}, word_group_id: {brand_project.word_group_id}")
+        logger.info("Brand project created with UUID: {}, word_group_id: {}", brand_project.uuid, brand_project.word_group_id)
 
         # 2. Create competitors (if provided)
-        competitors = []
-        for competitor_name in (project_data.competitors or [])[:10]:
-            competitor = Competitor(
-                name=competitor_name.strip(),
-                project_id=brand_project.uuid
-            )
-            db.add(competitor)
-            competitors.append(competitor)
+        competitors = await _insert_competitors(db, brand_project.uuid, project_data.competitors)
 
+        # Server defaults (create_time) come back via RETURNING, no refresh/re-select needed
         await db.commit()
-        await db.refresh(brand_project)
-
-        # 3. Load competitors
-        competitors_result = await db.execute(
-            select(Competitor).where(Competitor.project_id == brand_project.uuid)
-        )
-        competitors_db = competitors_result.scalars().all()
-
-        # 4. Build dict for BrandProjectResponse (Pydantic v2)
-        response = {
-            "uuid": brand_project.uuid,
-            "name": brand_project.name,
-            "brand_name": brand_project.brand_name,
-            "brand_description": brand_project.brand_description,
-            "keywords_count": brand_project.keywords_count,
-            "user_id": brand_project.user_id,
-            "word_group_id": brand_project.word_group_id,
-            "create_time": brand_project.create_time,
-            "status": brand_project.status,
-            "competitors": [
-                {
-                    "uuid": c.uuid,
-                    "name": c.name,
-                    "create_time": c.create_time
-                }
-                for c in competitors_db
-            ]
-        }
 
         # Response logging
-        logger.info(f"Sending response with word_group_id: {response['word_group_id']}")
+        logger.debug("Sending response with word_group_id: {}", brand_project.word_group_id)
 
-        # 5. Return via Pydantic v2 model (if doesn't match - catch error in log!)
-        return BrandProjectResponse.model_validate(response)
+        return _brand_project_response(brand_project, competitors, status_code=201)
 
     except Exception as e:
         await db.rollback()
-        logger.error(f"Error creating brand project: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception(f"Error creating brand project: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
@@ -1231,15 +990,17 @@ async def update_brand_project(
     project_id: uuid.UUID,
     project_data: BrandProjectUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
     try:
-        # Debug logging
-        logger.info(f"Updating brand project {project_id} with word_group_id: {project_data.word_group_id}")
+        # Debug logging (loguru formats arguments only if the record is emitted)
+        logger.debug("Updating brand project {} with word_group_id: {}", project_id, project_data.word_group_id)
         
         # 1. Find project
         project_result = await db.execute(
-            select(BrandProject).where(
+            select(BrandProject)
+            .options(*_brand_project_load_options())
+            .where(
                 BrandProject.uuid == project_id,
                 BrandProject.user_id == current_user.uuid
             )
@@ -1249,18 +1010,17 @@ async def update_brand_project(
         if not brand_project:
             raise HTTPException(status_code=404, detail="Brand project not found")
         
-        logger.info(f"Current project word_group_id: {brand_project.word_group_id}")
+        logger.debug("Current project word_group_id: {}", brand_project.word_group_id)
         
         # Check word group existence if specified
         if project_data.word_group_id:
-            group_result = await db.execute(
-                select(WordGroup).where(WordGroup.uuid == project_data.word_group_id)
+            group_exists = await db.scalar(
+                select(exists().where(WordGroup.uuid == project_data.word_group_id))
             )
-            word_group = group_result.scalar_one_or_none()
-            if not word_group:
+            if not group_exists:
                 logger.warning(f"Word group with ID {project_data.word_group_id} not found")
                 raise HTTPException(status_code=400, detail="Word group not found")
-            logger.info(f"Found word group for update: {word_group.name}")
+            logger.debug("Found word group for update: {}", project_data.word_group_id)
         
         # 2. Update fields
         if project_data.name is not None:
@@ -1274,212 +1034,192 @@ async def update_brand_project(
         if project_data.word_group_id is not None:
             brand_project.word_group_id = project_data.word_group_id
         
-        # 3. Update competitors if provided
+        # 3. Update competitors if provided (existing ones are already loaded with the project)
+        competitors = list(brand_project.competitors)
         if project_data.competitors is not None:
-            # Delete old competitors
-            existing_competitors = await db.execute(
-                select(Competitor).where(Competitor.project_id == brand_project.uuid)
+            # Delete old competitors with one server-side DELETE
+            await db.execute(
+                delete(Competitor)
+                .where(Competitor.project_id == brand_project.uuid)
+                .execution_options(synchronize_session=False)
             )
-            for competitor in existing_competitors.scalars().all():
-                await db.delete(competitor)
             
             # Add new competitors
-            for competitor_name in project_data.competitors[:10]:
-                if competitor_name.strip():
-                    competitor = Competitor(
-                        name=competitor_name.strip(),
-                        project_id=brand_project.uuid
-                    )
-                    db.add(competitor)
+            competitors = await _insert_competitors(db, brand_project.uuid, project_data.competitors)
             
         await db.commit()
-        await db.refresh(brand_project)
         
         # Logging after update
-        logger.info(f"Brand project updated, new word_group_id: {brand_project.word_group_id}")
-        
-        # 3. Load competitors
-        competitors_result = await db.execute(
-            select(Competitor).where(Competitor.project_id == brand_project.uuid)
-        )
-        competitors_db = competitors_result.scalars().all()
-        
-        # 4. Build response
-        response = {
-            "uuid": brand_project.uuid,
-            "name": brand_project.name,
-            "brand_name": brand_project.brand_name,
-            "brand_description": brand_project.brand_description,
-            "keywords_count": brand_project.keywords_count,
-            "user_id": brand_project.user_id,
-            "word_group_id": brand_project.word_group_id,
-            "create_time": brand_project.create_time,
-            "status": brand_project.status,
-            "competitors": [
-                {
-                    "uuid": c.uuid,
-                    "name": c.name,
-                    "create_time": c.create_time
-                }
-                for c in competitors_db
-            ]
-        }
+        logger.info("Brand project {} updated, new word_group_id: {}", brand_project.uuid, brand_project.word_group_id)
         
         # PUT response logging
-        logger.info(f"Sending PUT response with word_group_id: {response['word_group_id']}")
+        logger.debug("Sending PUT response with word_group_id: {}", brand_project.word_group_id)
         
-        return BrandProjectResponse.model_validate(response)
+        return _brand_project_response(brand_project, competitors)
         
     except HTTPException:
         raise
     except Exception as e:
         await db.rollback()
-        logger.error(f"Error updating brand project: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception(f"Error updating brand project: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
 @app.get("/api/brand-projects", response_model=List[BrandProjectResponse])
 async def get_brand_projects(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db_ro),
+    current_user: UserResponse = Depends(get_current_user)
 ):
+    """Newest projects first, one page at a time; the total number of projects is sent in X-Total-Count"""
+    # Competitors for the page are loaded with one IN query.
+    # The list is only serialized, so plain column rows are used instead of ORM instances.
+    active_projects = and_(BrandProject.user_id == current_user.uuid, BrandProject.status == 1)
     projects_result = await db.execute(
-        select(BrandProject).where(
-            BrandProject.user_id == current_user.uuid,
-            BrandProject.status == 1
+        select(
+            BrandProject.uuid,
+            BrandProject.name,
+            BrandProject.brand_name,
+            BrandProject.brand_description,
+            BrandProject.keywords_count,
+            BrandProject.user_id,
+            BrandProject.word_group_id,
+            BrandProject.create_time,
+            BrandProject.status
         )
+        .where(active_projects)
+        .order_by(BrandProject.create_time.desc(), BrandProject.uuid)
+        .limit(limit)
+        .offset(offset)
     )
-    projects = projects_result.scalars().all()
-    responses = []
-    for project in projects:
-        competitors_result = await db.execute(
-            select(Competitor).where(Competitor.project_id == project.uuid)
-        )
-        competitors = competitors_result.scalars().all()
-        competitors_resp = [
-            CompetitorResponse(
-                uuid=c.uuid,
-                name=c.name,
-                create_time=c.create_time
-            ) for c in competitors
-        ]
-        responses.append(BrandProjectResponse.model_validate({
-            "uuid": project.uuid,
-            "name": project.name,
-            "brand_name": project.brand_name,
-            "brand_description": project.brand_description,
-            "keywords_count": project.keywords_count,
-            "user_id": project.user_id,
-            "word_group_id": project.word_group_id,
-            "create_time": project.create_time,
-            "status": project.status,
-            "competitors": competitors_resp,
-        }))
-    return responses
+    projects = projects_result.all()
+    
+    # A short first page is the whole list, no count query needed
+    if offset == 0 and len(projects) < limit:
+        total = len(projects)
+    else:
+        total = await db.scalar(select(func.count()).select_from(BrandProject).where(active_projects))
+    headers = {"X-Total-Count": str(total)}
+    if not projects:
+        return ORJSONResponse([], headers=headers)
+
+    competitors_result = await db.execute(
+        select(Competitor.project_id, Competitor.uuid, Competitor.name, Competitor.create_time)
+        .where(Competitor.project_id.in_([project.uuid for project in projects]))
+    )
+    competitors_by_project = {}
+    for competitor in competitors_result:
+        competitors_by_project.setdefault(competitor.project_id, []).append(competitor)
+
+    # Payloads are built from trusted rows; orjson serializes them without jsonable_encoder
+    return ORJSONResponse([
+        _brand_project_payload(project, competitors_by_project.get(project.uuid, []))
+        for project in projects
+    ], headers=headers)
 
 
 @app.get("/api/brand-projects/{project_id}", response_model=BrandProjectResponse)
 async def get_brand_project(
     project_id: uuid.UUID,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db_ro),
+    current_user: UserResponse = Depends(get_current_user)
 ):
-    project = await db.scalar(
-        select(BrandProject)
+    user_id = current_user.uuid
+    project = await db.scalar(lambda_stmt(
+        lambda: select(BrandProject)
+        .options(*_brand_project_load_options())
         .where(BrandProject.uuid == project_id)
-        .where(BrandProject.user_id == current_user.uuid)
-    )
+        .where(BrandProject.user_id == user_id)
+    ))
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    competitors_result = await db.execute(
-        select(Competitor).where(Competitor.project_id == project.uuid)
-    )
-    competitors = competitors_result.scalars().all()
-    competitors_resp = [
-        CompetitorResponse(
-            uuid=c.uuid,
-            name=c.name,
-            create_time=c.create_time
-        ) for c in competitors
-    ]
-
-    return BrandProjectResponse.model_validate({
-        "uuid": project.uuid,
-        "name": project.name,
-        "brand_name": project.brand_name,
-        "brand_description": project.brand_description,
-        "keywords_count": project.keywords_count,
-        "user_id": project.user_id,
-        "word_group_id": project.word_group_id,
-        "create_time": project.create_time,
-        "status": project.status,
-        "competitors": competitors_resp,
-    })
+    return _brand_project_response(project, project.competitors)
 
-@app.get("/api/brand-projects/{project_id}/analytics")
+@app.get("/api/brand-projects/{project_id}/analytics", response_model=BrandAnalytics)
 async def get_brand_analytics(
     project_id: uuid.UUID,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db_ro),
+    current_user: UserResponse = Depends(get_current_user)
 ):
     try:
-        # Check project existence
-        project = await db.scalar(
-            select(BrandProject)
+        # Project check and mention aggregates are independent (concurrent when a pool is configured).
+        # Aggregates are discarded below if the project does not belong to the user.
+        if USE_BRAND_PROJECT_AGG:
+            # Counters kept current by the brand_mentions trigger, a single primary-key lookup
+            summary_stmt = select(
+                brand_project_agg.c.total,
+                brand_project_agg.c.brand_hits,
+                brand_project_agg.c.comp_hits
+            ).where(brand_project_agg.c.project_id == project_id)
+        else:
+            summary_stmt = select(
+                func.count(),
+                func.sum(case((BrandMention.brand_mentioned == 1, 1), else_=0)),
+                func.sum(case((BrandMention.competitor_mentioned == 1, 1), else_=0))
+            ).where(BrandMention.project_id == project_id)
+        top_competitors_stmt = (
+            select(BrandMention.mentioned_competitor, func.count().label("mentions"))
+            .where(
+                BrandMention.project_id == project_id,
+                BrandMention.mentioned_competitor.is_not(None)
+            )
+            .group_by(BrandMention.mentioned_competitor)
+            .order_by(desc("mentions"))
+            .limit(5)
+        )
+        # Only the latest mentions are rendered, fetch just those
+        recent_stmt = (
+            select(
+                BrandMention.uuid,
+                BrandMention.serp_id,
+                BrandMention.brand_mentioned,
+                BrandMention.competitor_mentioned,
+                BrandMention.mentioned_competitor,
+                BrandMention.brand_position,
+                BrandMention.competitor_position,
+                BrandMention.analysis_confidence,
+                BrandMention.create_time
+            )
+            .where(BrandMention.project_id == project_id)
+            .order_by(BrandMention.create_time.desc())
+            .limit(10)
+        )
+        project_rows, summary_rows, top_competitors_rows, recent_rows = await _fetch_all_rows(
+            db,
+            select(BrandProject.name, BrandProject.brand_name)
             .where(BrandProject.uuid == project_id)
-            .where(BrandProject.user_id == current_user.uuid)
+            .where(BrandProject.user_id == current_user.uuid),
+            summary_stmt,
+            top_competitors_stmt,
+            recent_stmt,
+            session_factory=AsyncSessionLocalRO
         )
-        if not project:
+        if not project_rows:
             raise HTTPException(status_code=404, detail="Project not found")
-
-        # Get all mentions for project
-        mentions_result = await db.execute(
-            select(BrandMention).where(BrandMention.project_id == project_id)
+        project = project_rows[0]
+
+        # There is no counters row for projects without mentions yet
+        total_queries, brand_mentions, competitor_mentions = summary_rows[0] if summary_rows else (0, 0, 0)
+        brand_mentions = brand_mentions or 0
+        competitor_mentions = competitor_mentions or 0
+
+        # At most 5 + 10 rows, validating them against the schema is cheap
+        return BrandAnalytics(
+            project_name=project.name,
+            brand_name=project.brand_name,
+            total_queries=total_queries,
+            brand_mentions=brand_mentions,
+            competitor_mentions=competitor_mentions,
+            brand_visibility_percentage=(brand_mentions / total_queries * 100) if total_queries > 0 else 0,
+            competitor_visibility_percentage=(competitor_mentions / total_queries * 100) if total_queries > 0 else 0,
+            top_competitors=[
+                TopCompetitor(name=name, mentions=count)
+                for name, count in top_competitors_rows
+            ],
+            recent_mentions=[RecentMention.model_validate(dict(row._mapping)) for row in recent_rows]
         )
-        mentions_list = mentions_result.scalars().all()
-
-        total_queries = len(mentions_list)
-        brand_mentions = sum(1 for m in mentions_list if m.brand_mentioned == 1)
-        competitor_mentions = sum(1 for m in mentions_list if m.competitor_mentioned == 1)
-
-        competitor_stats = {}
-        for mention in mentions_list:
-            if mention.mentioned_competitor:
-                competitor_stats[mention.mentioned_competitor] = competitor_stats.get(mention.mentioned_competitor, 0) + 1
-        top_competitors = [
-            {"name": name, "mentions": count}
-            for name, count in sorted(competitor_stats.items(), key=lambda x: x[1], reverse=True)[:5]
-        ]
-
-        # If you need schema - BrandAnalytics (as in your schemas.py)
-        return {
-            "project_name": project.name,
-            "brand_name": project.brand_name,
-            "total_queries": total_queries,
-            "brand_mentions": brand_mentions,
-            "competitor_mentions": competitor_mentions,
-            "brand_visibility_percentage": (brand_mentions / total_queries * 100) if total_queries > 0 else 0,
-            "competitor_visibility_percentage": (competitor_mentions / total_queries * 100) if total_queries > 0 else 0,
-            "top_competitors": top_competitors,
-            "recent_mentions": [
-                {
-                    "uuid": str(m.uuid),
-                    "serp_id": str(m.serp_id),
-                    "brand_mentioned": m.brand_mentioned,
-                    "competitor_mentioned": m.competitor_mentioned,
-                    "mentioned_competitor": m.mentioned_competitor,
-                    "brand_position": m.brand_position,
-                    "competitor_position": m.competitor_position,
-                    "analysis_confidence": m.analysis_confidence,
-                    "create_time": m.create_time.isoformat() if m.create_time else None,
-                }
-                for m in mentions_list[:10]
-            ]
-        }
-        # Can wrap this in BrandAnalytics.model_validate(...) if you want strict validation
 
     except Exception as e:
         logger.error(f"Error getting brand analytics: {e}")
@@ -1490,13 +1230,15 @@ async def get_brand_analytics(
 async def delete_brand_project(
     project_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user)
 ):
-    project = await db.scalar(
-        select(BrandProject)
+    user_id = current_user.uuid
+    project = await db.scalar(lambda_stmt(
+        lambda: select(BrandProject)
+        .options(raiseload("*"))
         .where(BrandProject.uuid == project_id)
-        .where(BrandProject.user_id == current_user.uuid)
-    )
+        .where(BrandProject.user_id == user_id)
+    ))
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
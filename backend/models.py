@@ -1,13 +1,15 @@
-from sqlalchemy import Column, String, Integer, TIMESTAMP, ForeignKey, Text, SmallInteger
+from sqlalchemy import Column, String, Integer, TIMESTAMP, ForeignKey, Text, SmallInteger, Index, table, column
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from database import Base
 import uuid
 
 class User(Base):
     """Модель пользователя"""
     __tablename__ = "users"
+    # Серверные значения (create_time) возвращаются через RETURNING, без повторного SELECT
+    __mapper_args__ = {"eager_defaults": True}
     
     uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String, unique=True, nullable=False, index=True)
@@ -18,6 +20,7 @@ class User(Base):
 class WordGroup(Base):
     """Модель группы слов"""
     __tablename__ = "word_groups"
+    __mapper_args__ = {"eager_defaults": True}
     
     uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False)
@@ -25,12 +28,21 @@ class WordGroup(Base):
     create_time = Column(TIMESTAMP, server_default=func.now())
     
     # Связи
-    user = relationship("User", lazy="selectin")
-    words = relationship("Word", back_populates="group", lazy="selectin")
+    user = relationship("User", lazy="select")
+    # ON DELETE SET NULL на стороне БД: при удалении группы слова не загружаются
+    words = relationship("Word", back_populates="group", lazy="raise_on_sql", passive_deletes=True)
 
 class Word(Base):
     """Модель слова"""
     __tablename__ = "words"
+    __table_args__ = (
+        # Выборка активных слов группы (WHERE group_id = ? AND status = 1)
+        Index("ix_word_group_status", "group_id", "status"),
+        # Частичный индекс для подсчета активных слов в статистике
+        Index("ix_word_active", "uuid", postgresql_where=text("status = 1")),
+    )
+    # create_time при INSERT и update_time при UPDATE возвращаются через RETURNING
+    __mapper_args__ = {"eager_defaults": True}
     
     uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False, index=True)
@@ -41,8 +53,9 @@ class Word(Base):
     status = Column(SmallInteger, default=1)
     
     # Связи
-    group = relationship("WordGroup", back_populates="words", lazy="selectin")
-    serp_results = relationship("WordSerp", back_populates="word", lazy="selectin")
+    group = relationship("WordGroup", back_populates="words", lazy="select")
+    # Коллекции без неявной загрузки: обращение без selectinload() в запросе - ошибка, а не скрытый SELECT
+    serp_results = relationship("WordSerp", back_populates="word", lazy="raise_on_sql")
 
 class LLM(Base):
     """Модель LLM провайдера"""
@@ -55,11 +68,16 @@ class LLM(Base):
     is_active = Column(SmallInteger, default=1)
     
     # Связь с результатами SERP
-    serp_results = relationship("WordSerp", back_populates="llm", lazy="selectin")
+    serp_results = relationship("WordSerp", back_populates="llm", lazy="raise_on_sql")
 
 class WordSerp(Base):
     """Модель результатов SERP от LLM"""
     __tablename__ = "word_serp"
+    __table_args__ = (
+        # Проверка "уже обработано" при обновлении SERP: word_id IN (...) AND llm_id IN (...) AND create_time > ?
+        # Не unique - каждое обновление сохраняет новый ответ, история остается
+        Index("ix_word_serp_word_llm", "word_id", "llm_id", "create_time"),
+    )
     
     uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     content = Column(Text, nullable=False)
@@ -68,10 +86,10 @@ class WordSerp(Base):
     create_time = Column(TIMESTAMP, server_default=func.now())
     
     # Связи
-    llm = relationship("LLM", back_populates="serp_results", lazy="selectin")
-    word = relationship("Word", back_populates="serp_results", lazy="selectin")
-    companies = relationship("Company", back_populates="serp", lazy="selectin")
-    brand_mentions = relationship("BrandMention", back_populates="serp", lazy="selectin")
+    llm = relationship("LLM", back_populates="serp_results", lazy="select")
+    word = relationship("Word", back_populates="serp_results", lazy="select")
+    companies = relationship("Company", back_populates="serp", lazy="raise_on_sql")
+    brand_mentions = relationship("BrandMention", back_populates="serp", lazy="raise_on_sql")
 
 class Company(Base):
     """Модель компании, извлеченной из SERP"""
@@ -79,14 +97,19 @@ class Company(Base):
     
     uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False, index=True)
-    serp_id = Column(UUID(as_uuid=True), ForeignKey("word_serp.uuid", ondelete="SET NULL"))
+    serp_id = Column(UUID(as_uuid=True), ForeignKey("word_serp.uuid", ondelete="SET NULL"), index=True)
     
     # Связь с SERP результатом
-    serp = relationship("WordSerp", back_populates="companies", lazy="selectin")
+    serp = relationship("WordSerp", back_populates="companies", lazy="select")
 
 class BrandProject(Base):
     """Модель проекта мониторинга бренда"""
     __tablename__ = "brand_projects"
+    __table_args__ = (
+        # Список активных проектов пользователя
+        Index("ix_brand_project_user_active", "user_id", postgresql_where=text("status = 1")),
+    )
+    __mapper_args__ = {"eager_defaults": True}
     
     uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False)  # Название проекта
@@ -99,25 +122,32 @@ class BrandProject(Base):
     status = Column(SmallInteger, default=1)  # 1 - активный, 0 - неактивный
     
     # Связи
-    word_group = relationship("WordGroup", lazy="selectin")
-    competitors = relationship("Competitor", back_populates="project", lazy="selectin")
-    brand_mentions = relationship("BrandMention", back_populates="project", lazy="selectin")
+    word_group = relationship("WordGroup", lazy="select")
+    competitors = relationship("Competitor", back_populates="project", lazy="raise_on_sql")
+    brand_mentions = relationship("BrandMention", back_populates="project", lazy="raise_on_sql")
 
 class Competitor(Base):
     """Модель конкурента в проекте"""
     __tablename__ = "competitors"
+    __mapper_args__ = {"eager_defaults": True}
     
     uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False, index=True)  # Название конкурента
-    project_id = Column(UUID(as_uuid=True), ForeignKey("brand_projects.uuid", ondelete="CASCADE"))
+    project_id = Column(UUID(as_uuid=True), ForeignKey("brand_projects.uuid", ondelete="CASCADE"), index=True)
     create_time = Column(TIMESTAMP, server_default=func.now())
     
     # Связь с проектом
-    project = relationship("BrandProject", back_populates="competitors", lazy="selectin")
+    project = relationship("BrandProject", back_populates="competitors", lazy="select")
 
 class BrandMention(Base):
     """Модель упоминания бренда/конкурента в SERP"""
     __tablename__ = "brand_mentions"
+    __table_args__ = (
+        # Фильтр по project_id и GROUP BY mentioned_competitor в аналитике проекта
+        Index("ix_brandmention_project_competitor", "project_id", "mentioned_competitor"),
+        # Последние упоминания проекта (ORDER BY create_time DESC LIMIT 10, обратный проход по индексу)
+        Index("ix_brandmention_project_createtime", "project_id", "create_time"),
+    )
     
     uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     serp_id = Column(UUID(as_uuid=True), ForeignKey("word_serp.uuid", ondelete="CASCADE"))
@@ -136,5 +166,58 @@ class BrandMention(Base):
     create_time = Column(TIMESTAMP, server_default=func.now())
     
     # Связи
-    serp = relationship("WordSerp", back_populates="brand_mentions", lazy="selectin")
-    project = relationship("BrandProject", back_populates="brand_mentions", lazy="selectin")
+    serp = relationship("WordSerp", back_populates="brand_mentions", lazy="select")
+    project = relationship("BrandProject", back_populates="brand_mentions", lazy="select")
+
+class LLMCache(Base):
+    """Модель кеша ответов LLM (ключ - sha256 от провайдера, модели, версии промпта и входа)"""
+    __tablename__ = "llm_cache"
+    
+    input_hash = Column(String(64), primary_key=True)
+    provider = Column(String, nullable=False)
+    model = Column(String)
+    prompt_version = Column(String, nullable=False)
+    response = Column(Text, nullable=False)
+    create_time = Column(TIMESTAMP, server_default=func.now())
+    expires_at = Column(TIMESTAMP, nullable=False, index=True)
+
+class SerpBatch(Base):
+    """Модель пакета SERP запросов, отправленного в OpenAI Batch API"""
+    __tablename__ = "serp_batches"
+    
+    uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    batch_id = Column(String, nullable=False, unique=True)  # ID пакета в OpenAI
+    input_file_id = Column(String, nullable=False)
+    output_file_id = Column(String, nullable=True)
+    status = Column(String, nullable=False, index=True)  # Статус пакета в OpenAI (validating, in_progress, completed, ...)
+    request_count = Column(Integer, default=0)
+    requests = Column(Text, nullable=False)  # JSON список custom_id ("word_uuid:llm_uuid")
+    create_time = Column(TIMESTAMP, server_default=func.now())
+    complete_time = Column(TIMESTAMP, nullable=True)
+
+class SerpJob(Base):
+    """Модель фоновой задачи обновления SERP данных"""
+    __tablename__ = "serp_jobs"
+    
+    uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    status = Column(String, nullable=False, default="pending")  # pending, running, completed, failed
+    group_id = Column(UUID(as_uuid=True), ForeignKey("word_groups.uuid", ondelete="SET NULL"), nullable=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.uuid", ondelete="CASCADE"))
+    use_batch = Column(SmallInteger, default=0)  # 1 - OpenAI запросы через Batch API
+    processed = Column(Integer, default=0)  # Обработано пар слово-LLM
+    total = Column(Integer, default=0)  # Всего пар к обработке
+    error = Column(Text, nullable=True)
+    create_time = Column(TIMESTAMP, server_default=func.now())
+    started_at = Column(TIMESTAMP, nullable=True)
+    heartbeat_at = Column(TIMESTAMP, nullable=True)  # Продлевает аренду задачи, пока она выполняется
+    finished_at = Column(TIMESTAMP, nullable=True)
+
+# Счетчики упоминаний по проектам (таблица и триггер создаются в database.init_database, только PostgreSQL).
+# Не входит в Base.metadata: на SQLite таблицы нет, аналитика считает агрегаты напрямую.
+brand_project_agg = table(
+    "brand_project_agg",
+    column("project_id"),
+    column("total"),
+    column("brand_hits"),
+    column("comp_hits"),
+)
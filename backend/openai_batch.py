@@ -0,0 +1,83 @@
+"""
+Клиент OpenAI Batch API для массового обновления SERP данных
+"""
+import json
+from typing import Dict, List
+import aiohttp
+from loguru import logger
+from config_simple import settings
+
+OPENAI_API_BASE = "https://api.openai.com/v1"
+
+# Статусы пакета, при которых результаты еще не готовы
+ACTIVE_BATCH_STATUSES = ("validating", "in_progress", "finalizing")
+
+def _auth_headers() -> Dict[str, str]:
+    return {"Authorization": f"Bearer {settings.openai_api_key}"}
+
+async def submit_batch(session: aiohttp.ClientSession, prompts: List[dict]) -> dict:
+    """
+    Отправка пакета запросов в Batch API.
+    prompts - список {"custom_id": str, "body": dict} для /v1/chat/completions.
+    Возвращает объект batch от OpenAI (id, input_file_id, status).
+    """
+    jsonl = "\n".join(
+        json.dumps({
+            "custom_id": prompt["custom_id"],
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": prompt["body"]
+        }, ensure_ascii=False)
+        for prompt in prompts
+    )
+
+    form = aiohttp.FormData()
+    form.add_field("purpose", "batch")
+    form.add_field("file", jsonl.encode("utf-8"), filename="serp_batch.jsonl", content_type="application/jsonl")
+
+    async with session.post(f"{OPENAI_API_BASE}/files", headers=_auth_headers(), data=form) as response:
+        if response.status != 200:
+            raise Exception(f"OpenAI file upload failed with status {response.status}")
+        input_file = await response.json()
+
+    async with session.post(
+        f"{OPENAI_API_BASE}/batches",
+        headers=_auth_headers(),
+        json={
+            "input_file_id": input_file["id"],
+            "endpoint": "/v1/chat/completions",
+            "completion_window": "24h"
+        }
+    ) as response:
+        if response.status != 200:
+            raise Exception(f"OpenAI batch creation failed with status {response.status}")
+        batch = await response.json()
+
+    logger.info(f"📦 Submitted OpenAI batch {batch['id']} with {len(prompts)} requests")
+    return batch
+
+async def get_batch(session: aiohttp.ClientSession, batch_id: str) -> dict:
+    """Получение статуса пакета"""
+    async with session.get(f"{OPENAI_API_BASE}/batches/{batch_id}", headers=_auth_headers()) as response:
+        if response.status != 200:
+            raise Exception(f"OpenAI batch status request failed with status {response.status}")
+        return await response.json()
+
+async def download_batch_output(session: aiohttp.ClientSession, output_file_id: str) -> Dict[str, str]:
+    """Загрузка результатов пакета: custom_id -> текст ответа (ошибочные запросы пропускаются)"""
+    async with session.get(f"{OPENAI_API_BASE}/files/{output_file_id}/content", headers=_auth_headers()) as response:
+        if response.status != 200:
+            raise Exception(f"OpenAI batch output download failed with status {response.status}")
+        content = await response.text()
+
+    outputs = {}
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        result = item.get("response") or {}
+        if item.get("error") or result.get("status_code") != 200:
+            logger.warning(f"OpenAI batch request {item.get('custom_id')} failed: {item.get('error')}")
+            continue
+        outputs[item["custom_id"]] = result["body"]["choices"][0]["message"]["content"]
+    return outputs
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List, Dict, Any
+from typing import Optional, List
 from datetime import datetime
 import uuid
 
@@ -171,6 +171,21 @@ class BrandMentionResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class TopCompetitor(BaseModel):
+    name: str
+    mentions: int
+
+class RecentMention(BaseModel):
+    uuid: uuid.UUID
+    serp_id: Optional[uuid.UUID] = None
+    brand_mentioned: int
+    competitor_mentioned: int
+    mentioned_competitor: Optional[str] = None
+    brand_position: Optional[int] = None
+    competitor_position: Optional[int] = None
+    analysis_confidence: Optional[int] = None
+    create_time: Optional[datetime] = None
+
 class BrandAnalytics(BaseModel):
     project_name: str
     brand_name: str
@@ -179,5 +194,20 @@ class BrandAnalytics(BaseModel):
     competitor_mentions: int
     brand_visibility_percentage: float
     competitor_visibility_percentage: float
-    top_competitors: List[Dict[str, Any]] = []
-    recent_mentions: List[Dict[str, Any]] = []
+    top_competitors: List[TopCompetitor] = []
+    recent_mentions: List[RecentMention] = []
+
+# Схемы для фоновых задач обновления SERP
+class SerpJobResponse(BaseModel):
+    uuid: uuid.UUID
+    status: str
+    group_id: Optional[uuid.UUID] = None
+    processed: int
+    total: int
+    error: Optional[str] = None
+    create_time: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
@@ -0,0 +1,59 @@
+"""
+Отдельный процесс для задач обновления SERP (SERP_JOBS_EXTERNAL=true).
+API только создает строку serp_jobs со статусом pending, воркер забирает ее
+и выполняет обновление вне процесса uvicorn, не конкурируя с запросами за event loop.
+Задачу упавшего воркера (heartbeat старше SERP_JOB_LEASE_SECONDS) забирает другой воркер.
+"""
+import asyncio
+from datetime import datetime, timezone
+from sqlalchemy import select, update, or_, and_
+from loguru import logger
+from config_simple import settings
+from database import AsyncSessionLocal, close_database
+from models import SerpJob
+from app_cache import init_cache, close_cache
+from serp_refresh import run_refresh, close_http_session, job_lease_expired
+
+async def claim_next_job():
+    """Атомарно переводит самую старую pending задачу (или running с истекшей арендой) в running
+    (SKIP LOCKED для нескольких воркеров)"""
+    claimable = or_(SerpJob.status == "pending", and_(SerpJob.status == "running", job_lease_expired()))
+    async with AsyncSessionLocal() as session:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        next_job = (
+            select(SerpJob.uuid)
+            .where(claimable)
+            .order_by(SerpJob.create_time)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await session.execute(
+            update(SerpJob)
+            .where(SerpJob.uuid == next_job, claimable)
+            .values(status="running", started_at=now, heartbeat_at=now)
+            .returning(SerpJob.uuid, SerpJob.group_id, SerpJob.use_batch)
+        )
+        job = result.one_or_none()
+        await session.commit()
+        return job
+
+async def run_worker():
+    """Главный цикл: выполняет задачи по одной, при пустой очереди ждет SERP_JOB_POLL_SECONDS"""
+    await init_cache()
+    logger.info("🚀 SERP job worker started")
+    try:
+        while True:
+            job = await claim_next_job()
+            if job is None:
+                await asyncio.sleep(settings.serp_job_poll_seconds)
+                continue
+            logger.info(f"Running SERP job {job.uuid}")
+            await run_refresh(job.uuid, job.group_id, bool(job.use_batch))
+    finally:
+        await close_http_session()
+        await close_cache()
+        await close_database()
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())
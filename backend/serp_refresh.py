@@ -0,0 +1,914 @@
+"""
+Конвейер обновления SERP данных: запросы к LLM провайдерам, извлечение компаний,
+сохранение результатов и задачи serp_jobs. Используется API (main.py) и отдельным
+процессом serp_job_worker.py.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, and_, func
+from sqlalchemy.orm import noload
+from typing import List, Optional, Callable, Awaitable, AsyncIterable, AsyncIterator
+import asyncio
+import time
+import uuid
+from loguru import logger
+
+from config_simple import settings
+from database import AsyncSessionLocal
+from models import Word, LLM, WordSerp, Company, BrandProject, Competitor, BrandMention, SerpBatch, SerpJob
+from llm_cache import make_cache_key, get_cached_response, set_cached_response
+from openai_batch import ACTIVE_BATCH_STATUSES, submit_batch, get_batch, download_batch_output
+from app_cache import cache_delete
+import aiohttp
+import json
+from pydantic import BaseModel, ValidationError
+from datetime import datetime, timedelta, timezone
+
+# Shared HTTP session for direct LLM calls (opened in lifespan, reuses TCP/TLS connections)
+http_session: Optional[aiohttp.ClientSession] = None
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Get shared aiohttp session, creating it lazily if needed"""
+    global http_session
+    if http_session is None or http_session.closed:
+        http_session = aiohttp.ClientSession(
+            # Keep idle connections to LLM APIs open between refresh waves so the
+            # gather fan-out reuses them instead of repeating TLS handshakes
+            connector=aiohttp.TCPConnector(
+                limit=200,
+                limit_per_host=100,
+                keepalive_timeout=60,
+                ttl_dns_cache=300
+            ),
+            timeout=aiohttp.ClientTimeout(total=60, connect=5)
+        )
+    return http_session
+
+async def close_http_session():
+    if http_session and not http_session.closed:
+        await http_session.close()
+
+async def get_gemini_response_direct(word: str) -> str:
+    """Direct Gemini response retrieval for brand analysis"""
+    try:
+        headers = {
+            "Content-Type": "application/json"
+        }
+        
+        data = {
+            "contents": [{
+                "parts": [{"text": word}]
+            }],
+            "generationConfig": {
+                "maxOutputTokens": 2000,
+                "temperature": 0.7
+            }
+        }
+        
+        async with get_http_session().post(
+            f"{settings.gemini_api_url}?key={settings.gemini_api_key}",
+            headers=headers,
+            json=data
+        ) as response:
+            if response.status == 200:
+                result = await response.json()
+                return result['candidates'][0]['content']['parts'][0]['text']
+            else:
+                logger.error(f"Gemini API error: {response.status}")
+                raise Exception(f"Gemini API failed with status {response.status}")
+            
+    except Exception as e:
+        logger.error(f"Error getting response from Gemini: {e}")
+        raise Exception(f"Failed to get Gemini response: {e}")
+
+async def get_anthropic_response_direct(word: str) -> str:
+    """Direct Anthropic response retrieval for brand analysis"""
+    try:
+        headers = {
+            "x-api-key": settings.anthropic_api_key,
+            "Content-Type": "application/json",
+            "anthropic-version": "2023-06-01"
+        }
+        
+        data = {
+            "model": settings.anthropic_model,
+            "max_tokens": 2000,
+            "messages": [{"role": "user", "content": word}]
+        }
+        
+        async with get_http_session().post(
+            settings.anthropic_api_url,
+            headers=headers,
+            json=data
+        ) as response:
+            if response.status == 200:
+                result = await response.json()
+                return result['content'][0]['text']
+            else:
+                logger.error(f"Anthropic API error: {response.status}")
+                raise Exception(f"Anthropic API failed with status {response.status}")
+            
+    except Exception as e:
+        logger.error(f"Error getting response from Anthropic: {e}")
+        raise Exception(f"Failed to get Anthropic response: {e}")
+
+async def get_grok_response_direct(word: str) -> str:
+    """Direct Grok response retrieval for brand analysis"""
+    try:
+        headers = {
+            "Authorization": f"Bearer {settings.grok_api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        data = {
+            "model": settings.grok_model,
+            "messages": [{"role": "user", "content": word}],
+            "max_tokens": 2000,
+            "temperature": 0.7
+        }
+        
+        async with get_http_session().post(
+            settings.grok_api_url,
+            headers=headers,
+            json=data
+        ) as response:
+            if response.status == 200:
+                result = await response.json()
+                return result['choices'][0]['message']['content']
+            else:
+                logger.error(f"Grok API error: {response.status}")
+                raise Exception(f"Grok API failed with status {response.status}")
+            
+    except Exception as e:
+        logger.error(f"Error getting response from Grok: {e}")
+        raise Exception(f"Failed to get Grok response: {e}")
+
+async def get_mistral_response_direct(word: str) -> str:
+    """Direct Mistral response retrieval for brand analysis"""
+    try:
+        headers = {
+            "Authorization": f"Bearer {settings.mistral_api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        data = {
+            "model": settings.mistral_model,
+            "messages": [{"role": "user", "content": word}],
+            "max_tokens": 2000,
+            "temperature": 0.7
+        }
+        
+        async with get_http_session().post(
+            settings.mistral_api_url,
+            headers=headers,
+            json=data
+        ) as response:
+            if response.status == 200:
+                result = await response.json()
+                return result['choices'][0]['message']['content']
+            else:
+                logger.error(f"Mistral API error: {response.status}")
+                raise Exception(f"Mistral API failed with status {response.status}")
+            
+    except Exception as e:
+        logger.error(f"Error getting response from Mistral: {e}")
+        raise Exception(f"Failed to get Mistral response: {e}")
+
+async def get_perplexity_response_direct(word: str) -> str:
+    """Direct Perplexity response retrieval for brand analysis"""
+    try:
+        headers = {
+            "Authorization": f"Bearer {settings.perplexity_api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        data = {
+            "model": settings.perplexity_model,
+            "messages": [{"role": "user", "content": word}],
+            "max_tokens": 2000,
+            "temperature": 0.7
+        }
+        
+        async with get_http_session().post(
+            settings.perplexity_api_url,
+            headers=headers,
+            json=data
+        ) as response:
+            if response.status == 200:
+                result = await response.json()
+                return result['choices'][0]['message']['content']
+            else:
+                logger.error(f"Perplexity API error: {response.status}")
+                raise Exception(f"Perplexity API failed with status {response.status}")
+            
+    except Exception as e:
+        logger.error(f"Error getting response from Perplexity: {e}")
+        raise Exception(f"Failed to get Perplexity response: {e}")
+
+class SerpWithCompanies(BaseModel):
+    """Structured OpenAI SERP answer: response text and companies mentioned in it"""
+    serp_markdown: str
+    companies: List[str]
+
+# JSON schema for OpenAI structured outputs (strict mode requires all fields and no extra ones)
+OPENAI_SERP_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "serp",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "serp_markdown": {"type": "string"},
+                "companies": {"type": "array", "items": {"type": "string"}}
+            },
+            "required": ["serp_markdown", "companies"],
+            "additionalProperties": False
+        }
+    }
+}
+
+OPENAI_SERP_SYSTEM_PROMPT = (
+    "Answer the user's query in markdown and put the answer into serp_markdown. "
+    "In companies list only company names, brands and business organizations mentioned in your answer "
+    "(no countries, cities or personal names)."
+)
+
+# Providers whose SERP response already contains extracted companies
+STRUCTURED_SERP_PROVIDERS = {"openai"}
+
+def _openai_serp_request_body(word: str, messages: Optional[list] = None) -> dict:
+    """OpenAI chat completion body for SERP query (shared by realtime and Batch API paths)"""
+    return {
+        "model": "gpt-4o-mini",
+        "messages": messages or [
+            {"role": "system", "content": OPENAI_SERP_SYSTEM_PROMPT},
+            {"role": "user", "content": word}
+        ],
+        "max_tokens": 2000,
+        "temperature": 0.7,
+        "response_format": OPENAI_SERP_RESPONSE_FORMAT
+    }
+
+def parse_serp_and_companies(content: str) -> tuple:
+    """Validate structured OpenAI SERP content, returns (serp_markdown, companies)"""
+    serp = SerpWithCompanies.model_validate_json(content)
+    companies = [c.strip() for c in serp.companies if c.strip()]
+    return serp.serp_markdown, companies[:10]  # Maximum 10 companies
+
+async def get_openai_response_direct(word: str) -> str:
+    """
+    Direct OpenAI response retrieval for brand analysis.
+    Returns structured JSON content (SerpWithCompanies): SERP text and companies come
+    from one call; on schema validation failure the error is sent back up to 2 times.
+    """
+    try:
+        headers = {
+            "Authorization": f"Bearer {settings.openai_api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        data = _openai_serp_request_body(word)
+        
+        for attempt in range(3):
+            async with get_http_session().post(
+                "https://api.openai.com/v1/chat/completions",
+                headers=headers,
+                json=data
+            ) as response:
+                if response.status != 200:
+                    logger.error(f"OpenAI API error: {response.status}")
+                    raise Exception(f"OpenAI API failed with status {response.status}")
+                result = await response.json()
+            
+            content = result['choices'][0]['message']['content']
+            try:
+                parse_serp_and_companies(content)
+                return content
+            except ValidationError as e:
+                if attempt == 2:
+                    raise
+                logger.warning(f"OpenAI SERP response failed validation, retrying: {e}")
+                data = _openai_serp_request_body(word, data["messages"] + [
+                    {"role": "assistant", "content": content},
+                    {"role": "user", "content": f"The response does not match the schema: {e}. Return valid JSON."}
+                ])
+            
+    except Exception as e:
+        logger.error(f"Error getting response from OpenAI: {e}")
+        raise Exception(f"Failed to get OpenAI response: {e}")
+
+def _parse_companies_text(companies_text: str) -> list:
+    """Parse comma-separated company names returned by extraction prompt"""
+    companies = [c.strip() for c in companies_text.split(',') if c.strip()]
+    return companies[:10]  # Maximum 10 companies
+
+async def extract_companies_from_response_direct(llm_response: str) -> list:
+    """Direct company extraction from LLM response"""
+    try:
+        cache_key = make_cache_key("openai:companies", "gpt-4o-mini", llm_response)
+        cached_text = await get_cached_response(cache_key)
+        if cached_text is not None:
+            return _parse_companies_text(cached_text)
+        
+        prompt = f"""
+        Analyze the following text and extract company names, brands, and organizations.
+        Return only a list of names separated by commas, without additional text.
+        
+        Text:
+        {llm_response}
+        """
+        
+        headers = {
+            "Authorization": f"Bearer {settings.openai_api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        data = {
+            "model": "gpt-4o-mini",
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": 2000,
+            "temperature": 0.3
+        }
+        
+        async with get_http_session().post(
+            "https://api.openai.com/v1/chat/completions",
+            headers=headers,
+            json=data
+        ) as response:
+            if response.status == 200:
+                result = await response.json()
+                companies_text = result['choices'][0]['message']['content']
+                await set_cached_response(cache_key, "openai:companies", "gpt-4o-mini", companies_text)
+                return _parse_companies_text(companies_text)
+            else:
+                logger.error(f"OpenAI API error during company extraction: {response.status}")
+                raise Exception(f"OpenAI API failed during company extraction: {response.status}")
+            
+    except Exception as e:
+        logger.error(f"Error extracting companies: {e}")
+        raise Exception(f"Failed to extract companies: {e}")
+
+# Direct response functions by LLM name: (settings API key attribute, function)
+DIRECT_LLM_HANDLERS = {
+    "openai": ("openai_api_key", get_openai_response_direct),
+    "gemini": ("gemini_api_key", get_gemini_response_direct),
+    "anthropic": ("anthropic_api_key", get_anthropic_response_direct),
+    "grok": ("grok_api_key", get_grok_response_direct),
+    "mistral": ("mistral_api_key", get_mistral_response_direct),
+    "perplexity": ("perplexity_api_key", get_perplexity_response_direct),
+}
+
+def _get_direct_llm_handler(llm_name: str):
+    """Get direct response function for LLM or None if it is not implemented/configured"""
+    handler = DIRECT_LLM_HANDLERS.get(llm_name.lower())
+    if not handler:
+        logger.warning(f"LLM {llm_name} not implemented, skipping")
+        return None
+    
+    api_key_attr, get_response = handler
+    if not getattr(settings, api_key_attr):
+        logger.error(f"{llm_name} API key not configured, skipping LLM '{llm_name}'")
+        return None
+    return get_response
+
+async def _fetch_serp_pair_direct(word: Word, llm: LLM, get_response, semaphore: asyncio.Semaphore):
+    """Get LLM response and extracted companies for one (word, LLM) pair"""
+    async with semaphore:
+        try:
+            logger.info(f"Processing word '{word.name}' with {llm.name}")
+            
+            # Identical (provider, model, word) requests are served from the persistent cache
+            provider = llm.name.lower()
+            structured = provider in STRUCTURED_SERP_PROVIDERS
+            cache_provider = f"{provider}:structured" if structured else provider
+            model = settings.get_llm_config(provider).get('model')
+            cache_key = make_cache_key(cache_provider, model, word.name)
+            llm_response = await get_cached_response(cache_key)
+            
+            if llm_response is None:
+                llm_response = await get_response(word.name)
+                if llm_response:
+                    await set_cached_response(cache_key, cache_provider, model, llm_response)
+            
+            if not llm_response:
+                logger.warning(f"No response from {llm.name} for word '{word.name}'")
+                return None
+            
+            # Structured responses already contain companies - no second extraction call
+            if structured:
+                llm_response, companies = parse_serp_and_companies(llm_response)
+                return word, llm, llm_response, companies
+            
+            # One extraction call on the whole response, after generation. Extracting from streamed
+            # fragments would overlap the two calls, but costs an extraction call per fragment,
+            # never hits the cache (keyed by the whole response) and splits the 10-company cap
+            try:
+                companies = await extract_companies_from_response_direct(llm_response)
+            except Exception as e:
+                logger.error(f"Error extracting companies for word '{word.name}' with LLM '{llm.name}': {e}")
+                companies = []
+            
+            return word, llm, llm_response, companies
+        except Exception as e:
+            logger.error(f"Error processing word '{word.name}' with LLM '{llm.name}': {e}")
+            return None
+
+async def _save_serp_result(db: AsyncSession, word: Word, llm: LLM, llm_response: str, companies: list):
+    """Save SERP response, its companies and brand mentions (without commit)"""
+    # uuid is assigned up front so companies can reference it without a flush per SERP
+    word_serp = WordSerp(
+        uuid=uuid.uuid4(),
+        content=llm_response,
+        llm_id=llm.uuid,
+        word_id=word.uuid,
+        create_time=datetime.now(timezone.utc).replace(tzinfo=None)
+    )
+    
+    # Save companies (the SERP is new, so only duplicates within the list are possible)
+    db.add_all([word_serp] + [
+        Company(name=company_name, serp_id=word_serp.uuid)
+        for company_name in dict.fromkeys(companies)
+    ])
+    
+    # Analyze brand mentions for this word group (if brand projects exist)
+    if word.group_id:
+        await analyze_brand_mentions_for_word_direct(word, word_serp, llm_response, db)
+
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+
+# /api/stats counts are global; dropped on every mutation of counted tables
+STATS_CACHE_KEY = "stats:v1"
+
+def word_analytics_cache_key(word_id: uuid.UUID) -> str:
+    """Word analytics cache entry; dropped when new SERP results are saved or the word changes"""
+    return f"word_analytics:{word_id}"
+
+async def _iter_completed(tasks: list) -> AsyncIterator:
+    """Task results in completion order, so each one can be saved as soon as it arrives"""
+    for next_result in asyncio.as_completed(tasks):
+        yield await next_result
+
+async def _iter_queue(queue: asyncio.Queue) -> AsyncIterator:
+    """Queue items until the None sentinel"""
+    while True:
+        item = await queue.get()
+        if item is None:
+            return
+        yield item
+
+async def _serp_pair_worker(pairs: asyncio.Queue, results: asyncio.Queue, semaphore: asyncio.Semaphore):
+    """Fetch queued (word, llm, get_response) pairs until the None sentinel, passing results on to the saver"""
+    async for word, llm, get_response in _iter_queue(pairs):
+        result = await _fetch_serp_pair_direct(word, llm, get_response, semaphore)
+        if result:
+            await results.put(result)
+
+async def _save_serp_results(
+    db: AsyncSession,
+    results: AsyncIterable,
+    on_saved: Optional[Callable[[int], Awaitable[None]]] = None
+) -> int:
+    """Save (word, llm, response, companies) results as they arrive, committing every serp_commit_chunk pairs.
+    on_saved(saved) is awaited after each commit."""
+    # AsyncSession is not safe for concurrent use, so results are saved sequentially
+    processed_count = 0
+    pending_count = 0  # Saved since the last commit
+    saved_word_ids = set()
+    
+    async for result in results:
+        if not result:
+            continue
+        
+        word, llm, llm_response, companies = result
+        try:
+            await _save_serp_result(db, word, llm, llm_response, companies)
+            pending_count += 1
+            saved_word_ids.add(word.uuid)
+            
+            # Commit in chunks: fewer round-trips and WAL flushes on bulk refresh
+            if pending_count >= settings.serp_commit_chunk:
+                await db.commit()
+                processed_count += pending_count
+                pending_count = 0
+                logger.info(f"Processed {processed_count} word-LLM pairs")
+                if on_saved:
+                    await on_saved(processed_count)
+            
+        except Exception as e:
+            # A failed flush/commit leaves the session unusable until rollback, and the rollback
+            # also discards every pair saved since the last commit, not only this one
+            logger.error(
+                f"Error saving word '{word.name}' with LLM '{llm.name}', "
+                f"discarding {pending_count} uncommitted pairs: {e}"
+            )
+            await db.rollback()
+            pending_count = 0
+            continue
+    
+    await db.commit()
+    processed_count += pending_count
+    if processed_count:
+        await cache_delete(STATS_CACHE_KEY)
+        for word_id in saved_word_ids:
+            await cache_delete(word_analytics_cache_key(word_id))
+    return processed_count
+
+def _batch_custom_id(word: Word, llm: LLM) -> str:
+    return f"{word.uuid}:{llm.uuid}"
+
+def _batch_response_getter(content: str):
+    """Response function returning already received Batch API output"""
+    async def get_response(word: str) -> str:
+        return content
+    return get_response
+
+async def _get_pending_batch_pairs(db: AsyncSession) -> set:
+    """(word_id, llm_id) pairs waiting in unfinished OpenAI batches"""
+    result = await db.execute(
+        select(SerpBatch.requests).where(SerpBatch.status.in_(ACTIVE_BATCH_STATUSES))
+    )
+    pairs = set()
+    for requests_json in result.scalars().all():
+        for custom_id in json.loads(requests_json):
+            word_id, llm_id = custom_id.split(":")
+            pairs.add((uuid.UUID(word_id), uuid.UUID(llm_id)))
+    return pairs
+
+async def _submit_serp_batch(db: AsyncSession, pairs: list):
+    """Submit (word, llm) pairs to OpenAI Batch API and store batch row"""
+    prompts = [
+        {"custom_id": _batch_custom_id(word, llm), "body": _openai_serp_request_body(word.name)}
+        for word, llm in pairs
+    ]
+    batch = await submit_batch(get_http_session(), prompts)
+    
+    db.add(SerpBatch(
+        batch_id=batch["id"],
+        input_file_id=batch["input_file_id"],
+        status=batch.get("status", "validating"),
+        request_count=len(prompts),
+        requests=json.dumps([prompt["custom_id"] for prompt in prompts])
+    ))
+    await db.commit()
+
+async def poll_serp_batches(db: AsyncSession) -> int:
+    """Check unfinished OpenAI batches and save results of completed ones"""
+    result = await db.execute(
+        select(SerpBatch).where(SerpBatch.status.in_(ACTIVE_BATCH_STATUSES))
+    )
+    batches = list(result.scalars().all())
+    
+    processed_count = 0
+    for batch in batches:
+        try:
+            batch_info = await get_batch(get_http_session(), batch.batch_id)
+            batch.status = batch_info["status"]
+            
+            if batch.status in ACTIVE_BATCH_STATUSES:
+                await db.commit()
+                continue
+            
+            # Terminal status: expired batches may still have partial output
+            outputs = {}
+            if batch_info.get("output_file_id"):
+                batch.output_file_id = batch_info["output_file_id"]
+                outputs = await download_batch_output(get_http_session(), batch.output_file_id)
+            
+            pairs = [custom_id.split(":") for custom_id in outputs]
+            words_result = await db.execute(
+                select(Word).where(Word.uuid.in_([uuid.UUID(word_id) for word_id, _ in pairs]))
+            )
+            words_by_id = {word.uuid: word for word in words_result.scalars().all()}
+            llms_result = await db.execute(
+                select(LLM).where(LLM.uuid.in_([uuid.UUID(llm_id) for _, llm_id in pairs]))
+            )
+            llms_by_id = {llm.uuid: llm for llm in llms_result.scalars().all()}
+            
+            # Company extraction stays realtime, only SERP generation goes through Batch API
+            semaphore = asyncio.Semaphore(settings.serp_concurrency)
+            tasks = []
+            for custom_id, content in outputs.items():
+                word_id, llm_id = custom_id.split(":")
+                word = words_by_id.get(uuid.UUID(word_id))
+                llm = llms_by_id.get(uuid.UUID(llm_id))
+                if word and llm:
+                    tasks.append(_fetch_serp_pair_direct(word, llm, _batch_response_getter(content), semaphore))
+            
+            processed_count += await _save_serp_results(db, _iter_completed(tasks))
+            
+            # Batch state is (re)applied after the save: a rollback of a failed chunk discards it
+            batch.status = batch_info["status"]
+            if batch_info.get("output_file_id"):
+                batch.output_file_id = batch_info["output_file_id"]
+            batch.complete_time = datetime.now(timezone.utc).replace(tzinfo=None)
+            await db.commit()
+            logger.info(f"📦 OpenAI batch {batch.batch_id} finished with status '{batch.status}', {len(outputs)} responses")
+            
+        except Exception as e:
+            logger.error(f"Error polling OpenAI batch {batch.batch_id}: {e}")
+            await db.rollback()
+    
+    return processed_count
+
+# Words read per page in SERP refresh
+SERP_WORDS_PAGE_SIZE = 200
+
+# Active LLM providers change only through admin edits: (loaded_at monotonic, [LLM])
+ACTIVE_LLMS_TTL_SECONDS = 60
+_active_llms_cache: tuple = (0.0, [])
+
+async def _get_active_llms(db: AsyncSession) -> list:
+    """Active LLM providers, cached for ACTIVE_LLMS_TTL_SECONDS"""
+    global _active_llms_cache
+    loaded_at, llms = _active_llms_cache
+    if time.monotonic() - loaded_at < ACTIVE_LLMS_TTL_SECONDS:
+        return llms
+    
+    # Only uuid/name are needed, don't pull every SERP result through the selectin relationship
+    llms_result = await db.execute(
+        select(LLM).options(noload(LLM.serp_results)).where(LLM.is_active == 1)
+    )
+    llms = list(llms_result.scalars().all())
+    _active_llms_cache = (time.monotonic(), llms)
+    return llms
+
+def invalidate_active_llms():
+    global _active_llms_cache
+    _active_llms_cache = (0.0, [])
+
+async def update_serp_data_direct(
+    db: AsyncSession,
+    group_id: Optional[uuid.UUID] = None,
+    use_batch: bool = False,
+    on_progress: Optional[ProgressCallback] = None
+):
+    """
+    Direct SERP data update without worker with brand monitoring support.
+    With use_batch=True (bulk refresh), OpenAI requests go through Batch API
+    when there are at least openai_batch_threshold of them.
+    on_progress(done, total) is awaited as realtime pairs are saved.
+    """
+    try:
+        logger.info("🚀 Starting direct SERP data update")
+        
+        if use_batch:
+            # Collect results of finished batches before deciding what to request
+            await poll_serp_batches(db)
+        
+        # Get active LLMs
+        llms = await _get_active_llms(db)
+        
+        # Resolve provider functions once per LLM
+        llm_handlers = {}
+        for llm in llms:
+            get_response = _get_direct_llm_handler(llm.name)
+            if get_response:
+                llm_handlers[llm.uuid] = get_response
+        
+        # Check if data needs updating
+        two_weeks_ago = datetime.now(timezone.utc) - timedelta(days=14)
+        # Remove timezone for PostgreSQL comparison
+        two_weeks_ago_naive = two_weeks_ago.replace(tzinfo=None)
+        
+        # Pairs already submitted to OpenAI Batch API are not requested again
+        pending_batch_pairs = await _get_pending_batch_pairs(db) if llm_handlers else set()
+        
+        # Active words are read in keyset pages (relationships are not needed here)
+        words_query = (
+            select(Word)
+            .options(noload(Word.group), noload(Word.serp_results))
+            .where(Word.status == 1)
+            .order_by(Word.uuid)
+            .limit(SERP_WORDS_PAGE_SIZE)
+        )
+        if group_id:
+            words_query = words_query.where(Word.group_id == group_id)
+        
+        # Bounded pipeline: pages of words -> pair queue -> serp_concurrency LLM workers -> result queue -> saver.
+        # The producer waits while the queues are full, so memory does not grow with the catalogue;
+        # the saver commits every serp_commit_chunk pairs in its own session (this one keeps reading words)
+        pair_queue = asyncio.Queue(maxsize=settings.serp_concurrency * 2)
+        result_queue = asyncio.Queue(maxsize=settings.serp_concurrency * 2)
+        semaphore = asyncio.Semaphore(settings.serp_concurrency)
+        batching = use_batch and settings.openai_batch_threshold > 0
+        batch_pairs = []
+        words_count = 0
+        queued = 0
+        
+        async def report_saved(saved: int):
+            if not on_progress:
+                return
+            # A failed progress update must not stop the saver: workers would block on a full result queue
+            try:
+                # The total grows while words are still being read
+                await on_progress(saved, queued)
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to report SERP refresh progress: {e}")
+        
+        async def save_results() -> int:
+            async with AsyncSessionLocal() as session:
+                return await _save_serp_results(session, _iter_queue(result_queue), report_saved)
+        
+        workers = [
+            asyncio.create_task(_serp_pair_worker(pair_queue, result_queue, semaphore))
+            for _ in range(settings.serp_concurrency)
+        ]
+        
+        async def feed_workers():
+            """Read words and queue their pairs, then shut the workers and the saver down"""
+            nonlocal words_count, queued, batch_pairs
+            last_word_id = None
+            while True:
+                page_query = words_query
+                if last_word_id is not None:
+                    page_query = page_query.where(Word.uuid > last_word_id)
+                words = list((await db.scalars(page_query)).all())
+                if not words:
+                    break
+                last_word_id = words[-1].uuid
+                words_count += len(words)
+                if not llm_handlers:
+                    continue
+                
+                # Pairs already processed within two weeks, one query per page
+                processed_result = await db.execute(
+                    select(WordSerp.word_id, WordSerp.llm_id).where(
+                        and_(
+                            WordSerp.word_id.in_([word.uuid for word in words]),
+                            WordSerp.llm_id.in_(list(llm_handlers)),
+                            WordSerp.create_time > two_weeks_ago_naive
+                        )
+                    ).distinct()
+                )
+                processed_pairs = set(processed_result.all()) | pending_batch_pairs
+                # End the read transaction so the connection is not held while waiting for queue space
+                await db.commit()
+                
+                for word in words:
+                    for llm in llms:
+                        if llm.uuid not in llm_handlers:
+                            continue
+                        
+                        if (word.uuid, llm.uuid) in processed_pairs:
+                            logger.info(f"Word '{word.name}' with LLM '{llm.name}' already processed")
+                            continue
+                        
+                        # OpenAI pairs wait until the total is known to choose Batch API or realtime
+                        if batching and llm.name.lower() == "openai":
+                            batch_pairs.append((word, llm))
+                            continue
+                        
+                        await pair_queue.put((word, llm, llm_handlers[llm.uuid]))
+                        queued += 1
+            
+            logger.info(f"Found {words_count} words and {len(llms)} LLMs for processing")
+            
+            # Bulk OpenAI requests go through Batch API (half price, separate rate limits);
+            # small refreshes keep the realtime path
+            if batch_pairs and len(batch_pairs) >= settings.openai_batch_threshold:
+                try:
+                    await _submit_serp_batch(db, batch_pairs)
+                    batch_pairs = []
+                except Exception as e:
+                    logger.error(f"Error submitting OpenAI batch, falling back to realtime requests: {e}")
+            
+            for word, llm in batch_pairs:
+                await pair_queue.put((word, llm, llm_handlers[llm.uuid]))
+                queued += 1
+            
+            for _ in workers:
+                await pair_queue.put(None)
+            await asyncio.gather(*workers)
+            await result_queue.put(None)
+        
+        feeder = asyncio.create_task(feed_workers())
+        saver = asyncio.create_task(save_results())
+        try:
+            # The feeder and the saver wait on each other through the bounded queues: if either one
+            # fails, the other would block forever, so the first failure stops the whole pipeline
+            await asyncio.wait([feeder, saver], return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            for task in [feeder, saver, *workers]:
+                if not task.done():
+                    task.cancel()
+        for task in (feeder, saver):
+            if not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+        processed_count = saver.result()
+        
+        if on_progress:
+            await on_progress(processed_count, queued)
+        logger.info(f"✅ SERP data update completed. Processed {processed_count} pairs, extracted companies and analyzed brands")
+        
+    except Exception as e:
+        logger.error(f"Error in direct SERP data update: {e}")
+        await db.rollback()
+        raise
+
+async def _update_serp_job(job_id: uuid.UUID, **values):
+    """Update job state in its own session (refresh session commits/rollbacks independently)"""
+    async with AsyncSessionLocal() as session:
+        await session.execute(update(SerpJob).where(SerpJob.uuid == job_id).values(**values))
+        await session.commit()
+
+def job_lease_expired():
+    """No heartbeat from the job holder for serp_job_lease_seconds: the process running it has stopped"""
+    stale_before = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=settings.serp_job_lease_seconds)
+    return func.coalesce(SerpJob.heartbeat_at, SerpJob.started_at, SerpJob.create_time) < stale_before
+
+async def fail_orphaned_jobs() -> int:
+    """Fail pending/running jobs whose lease expired: in-process jobs (BackgroundTasks) do not survive an API restart"""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            update(SerpJob)
+            .where(SerpJob.status.in_(["pending", "running"]), job_lease_expired())
+            .values(
+                status="failed",
+                error="Interrupted: the process running the job stopped",
+                finished_at=datetime.now(timezone.utc).replace(tzinfo=None)
+            )
+        )
+        await session.commit()
+        return result.rowcount
+
+async def run_refresh(job_id: uuid.UUID, group_id: Optional[uuid.UUID] = None, use_batch: bool = False):
+    """Background SERP refresh: request-bound session is closed after response, so open a new one"""
+    async def on_progress(done: int, total: int):
+        await _update_serp_job(job_id, processed=done, total=total)
+    
+    async def send_heartbeats():
+        # Keeps the lease: a job without heartbeats is failed by the API or reclaimed by serp_job_worker.py
+        while True:
+            await asyncio.sleep(max(1, settings.serp_job_lease_seconds // 3))
+            try:
+                await _update_serp_job(job_id, heartbeat_at=datetime.now(timezone.utc).replace(tzinfo=None))
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to send heartbeat for SERP job {job_id}: {e}")
+    
+    heartbeat = asyncio.create_task(send_heartbeats())
+    try:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        await _update_serp_job(job_id, status="running", started_at=now, heartbeat_at=now)
+        async with AsyncSessionLocal() as db:
+            await update_serp_data_direct(db, group_id=group_id, use_batch=use_batch, on_progress=on_progress)
+        await _update_serp_job(job_id, status="completed", finished_at=datetime.now(timezone.utc).replace(tzinfo=None))
+    except Exception as e:
+        logger.error(f"SERP refresh job {job_id} failed: {e}")
+        await _update_serp_job(job_id, status="failed", error=str(e), finished_at=datetime.now(timezone.utc).replace(tzinfo=None))
+    finally:
+        heartbeat.cancel()
+
+async def analyze_brand_mentions_for_word_direct(word, word_serp, llm_response, db):
+    """Analyze brand mentions in LLM response for specific word"""
+    try:
+        from datetime import timezone
+        
+        # Get all brand projects for this word's group
+        brand_projects = await db.execute(
+            select(BrandProject).where(BrandProject.word_group_id == word.group_id)
+        )
+        
+        for brand_project in brand_projects.scalars().all():
+            logger.info(f"🔍 Analyzing brand project: {brand_project.name} (brand: {brand_project.brand_name})")
+            
+            # Get competitors for this project
+            competitors = await db.execute(
+                select(Competitor).where(Competitor.project_id == brand_project.uuid)
+            )
+            competitors_list = list(competitors.scalars().all())
+            logger.info(f"📋 Found {len(competitors_list)} competitors: {[c.name for c in competitors_list]}")
+            
+            # Check brand and competitor mentions
+            brand_mentioned = brand_project.brand_name.lower() in llm_response.lower()
+            logger.info(f"🏷️ Brand '{brand_project.brand_name}' mentioned: {brand_mentioned}")
+            
+            # Always create a record for the brand project, even if no competitors
+            if not competitors_list:
+                logger.info("⚠️ No competitors found, creating brand-only mention record")
+                brand_mention = BrandMention(
+                    project_id=brand_project.uuid,
+                    serp_id=word_serp.uuid,
+                    brand_mentioned=1 if brand_mentioned else 0,
+                    mentioned_competitor=None,
+                    competitor_mentioned=0
+                )
+                db.add(brand_mention)
+                logger.info(f"✅ Created brand mention record: brand={brand_mentioned}")
+            
+            for competitor in competitors_list:
+                competitor_mentioned = competitor.name.lower() in llm_response.lower()
+                logger.info(f"🏢 Competitor '{competitor.name}' mentioned: {competitor_mentioned}")
+                
+                # Create mention record for each competitor (whether mentioned or not)
+                brand_mention = BrandMention(
+                    project_id=brand_project.uuid,
+                    serp_id=word_serp.uuid,
+                    brand_mentioned=1 if brand_mentioned else 0,
+                    mentioned_competitor=competitor.name,
+                    competitor_mentioned=1 if competitor_mentioned else 0
+                )
+                db.add(brand_mention)
+                logger.info(f"✅ Created mention record: brand={brand_mentioned}, competitor={competitor.name}, mentioned={competitor_mentioned}")
+                    
+    except Exception as e:
+        logger.error(f"Error analyzing brand mentions: {e}")